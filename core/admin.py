@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.urls import path, reverse
 from django.shortcuts import redirect
@@ -8,7 +11,24 @@ from .models import (
     CachedData, PropLine, PropProjection, OddsEventMap, OddsEvent, 
     PlayerProp, PropLineHistory, PropGrade, DataRefreshLog
 )
-from .management.commands.refresh_player_props import Command as RefreshCommand
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator for unbounded tables (history/logs) that uses the Postgres
+    reltuples estimate for unfiltered changelists instead of a full COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        if connection.vendor == 'postgresql' and not self.object_list.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [self.object_list.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row is not None and row[0] >= 0:
+                return row[0]
+        return super().count
 
 
 @admin.register(Team)
@@ -22,6 +42,7 @@ class PlayerAdmin(admin.ModelAdmin):
     list_display = ['player_name', 'position', 'team_abbr', 'team_name', 'jersey_number']
     list_filter = ['position', 'team']
     search_fields = ['player_name']
+    list_select_related = ['team']
     
     def team_abbr(self, obj):
         return obj.team_abbr
@@ -39,6 +60,7 @@ class GameAdmin(admin.ModelAdmin):
     list_display = ['__str__', 'game_date', 'completed']
     list_filter = ['season', 'week', 'completed']
     search_fields = ['home_team__team_abbr', 'away_team__team_abbr']
+    list_select_related = ['home_team', 'away_team']
 
 
 @admin.register(OddsEvent)
@@ -59,6 +81,9 @@ class OddsEventAdmin(admin.ModelAdmin):
         """Refresh player props for all active events"""
         if request.method == 'POST':
             try:
+                # Imported lazily so admin startup doesn't pay for the
+                # command's heavy dependencies
+                from core.management.commands.refresh_player_props import Command as RefreshCommand
                 # Run the refresh command
                 refresh_cmd = RefreshCommand()
                 refresh_cmd.handle()
@@ -79,6 +104,10 @@ class PlayerPropAdmin(admin.ModelAdmin):
     list_filter = ['market_key', 'event__is_active', 'last_updated']
     search_fields = ['player_name', 'market_key']
     readonly_fields = ['last_updated']
+    list_select_related = ['event']
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 
 @admin.register(PropLineHistory)
@@ -88,6 +117,9 @@ class PropLineHistoryAdmin(admin.ModelAdmin):
     search_fields = ['player_name', 'game_id', 'market_key']
     readonly_fields = ['captured_at']
     ordering = ['-captured_at']
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 
 @admin.register(PropGrade)
@@ -96,7 +128,11 @@ class PropGradeAdmin(admin.ModelAdmin):
     list_filter = ['outcome', 'graded_at']
     search_fields = ['proplinehistory__player_name', 'proplinehistory__market_key']
     readonly_fields = ['graded_at']
+    list_select_related = ['proplinehistory']
     ordering = ['-graded_at']
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 
 @admin.register(DataRefreshLog)
@@ -105,6 +141,10 @@ class DataRefreshLogAdmin(admin.ModelAdmin):
     list_filter = ['api_status', 'timestamp']
     search_fields = ['event__home_team', 'event__away_team']
     readonly_fields = ['timestamp']
+    list_select_related = ['event']
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 
 @admin.register(OddsEventMap)
@@ -11,8 +11,7 @@ def landing(request: HttpRequest) -> HttpResponse:
     schedule = nfl.load_schedule_2025()
     current_week = nfl.get_current_week(nfl.SEASON)
     week = current_week
-    games_map = nfl.game_id_map(schedule)
-    games = [g for g in games_map.values() if g['week'] == week]
+    games = nfl.games_by_week(schedule).get(week, [])
     context = {
         'title': 'SecretBox',
         'season': nfl.SEASON,
@@ -25,13 +24,10 @@ def landing(request: HttpRequest) -> HttpResponse:
 
 def week_view(request: HttpRequest, week: int) -> HttpResponse:
     schedule = nfl.load_schedule_2025()
-    games_map = nfl.game_id_map(schedule)
-    games = [g for g in games_map.values() if g['week'] == week]
+    games = nfl.games_by_week(schedule).get(week, [])
 
     qb_df = nfl.starting_qbs_for_week(week)
-    qb_prev = {}
-    for _, r in qb_df.iterrows():
-        qb_prev[str(r['player_id'])] = nfl.previous_week_qb_line(week, str(r['player_id']))
+    qb_prev = nfl.previous_week_qb_lines(week, qb_df['player_id'].astype(str).tolist())
 
     context = {
         'title': 'Week',
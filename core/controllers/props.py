@@ -2,9 +2,13 @@
 Props controller for PrizePicks parlay functionality.
 Handles parlay context and evaluation for current-week games only.
 """
+import functools
+import hashlib
 import json
+import orjson
 from django.http import JsonResponse, HttpResponse
 from django.conf import settings
+from django.db.models import Max
 from services.nfl import get_current_week, get_current_week_games
 from services import nfl
 from services.odds_provider import (
@@ -14,13 +18,20 @@ from services.odds_provider import (
     parse_props_response,
 )
 from core.models import OddsEventMap
-from django.views.decorators.http import require_GET
+from django.views.decorators.http import require_GET, condition
 from django.utils import timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=64)
+def _parse_markets(markets_csv: str) -> tuple:
+    """Parse a markets CSV once per distinct query string. Sorting keeps the
+    SQL IN list stable so prepared-statement plans can be reused."""
+    return tuple(sorted(m.strip() for m in markets_csv.split(',') if m.strip()))
+
+
 def get_parlay_context(season: int, game_id_sb: str):
     """
     Get parlay context for a specific game.
@@ -28,8 +39,8 @@ def get_parlay_context(season: int, game_id_sb: str):
     """
     wk = get_current_week(season)
     games = get_current_week_games(season, wk)
-    
-    if game_id_sb not in set(games["game_id_sb"]):
+
+    if game_id_sb not in nfl.current_week_game_ids(season, wk):
         return {"enabled": False, "reason": "not_current_week"}
 
     rows = fetch_prizepicks_props_for_games(season, wk, games["game_id_sb"].tolist())
@@ -55,27 +66,45 @@ def evaluate_parlay(request):
 
         # For now, return a simple response since we don't have the full ML pipeline
         # In a real implementation, this would use the projection engine
-        win_prob = 0.5  # Placeholder - would be calculated from ML model
-        ev = 0.0  # Placeholder - would be calculated from win prob and payout structure
-        
-        detail = []
+        win_prob = round(0.5, 3)  # Placeholder - would be calculated from ML model
+        ev = round(0.0, 3)  # Placeholder - would be calculated from win prob and payout structure
+
+        # Mutate legs in place; avoids allocating a copy per leg
         for leg in legs:
-            detail.append({
-                **leg, 
-                "win_prob": round(win_prob, 3)
-            })
+            leg["win_prob"] = win_prob
+
+        return HttpResponse(
+            orjson.dumps({
+                "legs": legs,
+                "win_prob": win_prob,
+                "ev": ev
+            }),
+            content_type="application/json"
+        )
 
-        return JsonResponse({
-            "legs": detail, 
-            "win_prob": round(win_prob, 3), 
-            "ev": round(ev, 3)
-        })
-        
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
 
 
+def _game_props_last_modified(request, game_id: str):
+    """Newest prop update for the event; payload only changes when this does."""
+    from core.models import PlayerProp
+    return PlayerProp.objects.filter(event__game_id=game_id).aggregate(
+        Max('last_updated')
+    )['last_updated__max']
+
+
+def _game_props_etag(request, game_id: str):
+    """Per-event ETag so pollers get 304s instead of a full query + serialize."""
+    ts = _game_props_last_modified(request, game_id)
+    if ts is None:
+        return None
+    markets_csv = request.GET.get('markets', 'player_pass_yds')
+    return hashlib.md5(f"{game_id}:{markets_csv}:{ts.isoformat()}".encode()).hexdigest()
+
+
 @require_GET
+@condition(etag_func=_game_props_etag, last_modified_func=_game_props_last_modified)
 def game_props(request, game_id: str):
     """GET /game/<game_id>/props
     Returns player props from database first, falls back to API if needed.
@@ -120,38 +149,49 @@ def game_props(request, game_id: str):
                 }, status=204)
         
         # Get requested markets
-        requested_markets = [m.strip() for m in markets_csv.split(',') if m.strip()]
-        
-        # Query props from database
-        props = PlayerProp.objects.filter(
+        requested_markets = _parse_markets(markets_csv)
+
+        # Query props from database, pulling any matching ML prediction in the
+        # same round-trip via correlated subqueries (LEFT JOIN semantics).
+        from core.models import Prediction
+        from django.db.models import OuterRef, Subquery
+        pred_sub = Prediction.objects.filter(
+            game__game_id=game_id,
+            player__player_name=OuterRef('player_name'),
+            prop_type=OuterRef('market_key'),
+        )
+        # Project only the columns the response uses to cut row width
+        props = list(PlayerProp.objects.filter(
             event=event,
             market_key__in=requested_markets,
             is_active=True
-        ).order_by('market_key', 'player_name')
-        
-        # Get ML predictions for these props
-        from core.models import Prediction
-        predictions = {}
-        if props.exists():
-            # Get predictions for the same players and markets
-            preds = Prediction.objects.filter(
-                game__game_id=game_id,
-                prop_type__in=requested_markets
-            ).select_related('player')
-            
-            for pred in preds:
-                key = f"{pred.player.player_name}_{pred.prop_type}"
-                predictions[key] = {
-                    'over_probability': pred.over_probability,
-                    'under_probability': pred.under_probability,
-                    'predicted_value': pred.predicted_value,
-                    'edge': pred.edge,
-                    'model_version': pred.model_version
-                }
-        
-        if not props.exists():
-            # No data in database, try API as fallback
-            return fetch_from_api_fallback(game_id, game, markets_csv)
+        ).only(
+            'market_key', 'player_name', 'over_odds', 'over_point',
+            'under_odds', 'under_point', 'last_updated'
+        ).annotate(
+            pred_over_probability=Subquery(pred_sub.values('over_probability')[:1]),
+            pred_under_probability=Subquery(pred_sub.values('under_probability')[:1]),
+            pred_predicted_value=Subquery(pred_sub.values('predicted_value')[:1]),
+            pred_edge=Subquery(pred_sub.values('edge')[:1]),
+            pred_model_version=Subquery(pred_sub.values('model_version')[:1]),
+        ).order_by('market_key', 'player_name').iterator(chunk_size=500))
+
+        # Bulk-fetch player/team info in one query instead of one per prop row
+        from core.models import Player
+        player_names = {prop.player_name for prop in props}
+        players = {
+            p.player_name: p
+            for p in Player.objects.filter(
+                player_name__in=player_names
+            ).select_related('team').only(
+                'player_name', 'team__team_abbr', 'team__team_name'
+            )
+        }
+
+        if not props:
+            # No data in database, try API as fallback; reuse the event we
+            # already fetched so the fallback skips the OddsEventMap lookup
+            return fetch_from_api_fallback(game_id, game, markets_csv, event=event)
         
         # Group props by market
         market_groups = {}
@@ -163,9 +203,8 @@ def game_props(request, game_id: str):
                     'lines': []
                 }
             
-            # Get player team information
-            from core.models import Player
-            player = Player.objects.filter(player_name=prop.player_name).first()
+            # Get player team information from the bulk-fetched map
+            player = players.get(prop.player_name)
             team_abbr = player.team_abbr if player else "UNK"
             team_name = player.team_name if player else "Unknown Team"
             
@@ -184,16 +223,14 @@ def game_props(request, game_id: str):
                 } if prop.under_odds is not None and prop.under_point is not None else None
             }
             
-            # Add ML predictions if available
-            pred_key = f"{prop.player_name}_{prop.market_key}"
-            if pred_key in predictions:
-                pred = predictions[pred_key]
+            # Add ML predictions if available (annotated by the subqueries)
+            if prop.pred_predicted_value is not None:
                 line['ml_prediction'] = {
-                    'over_probability': pred['over_probability'],
-                    'under_probability': pred['under_probability'],
-                    'predicted_value': pred['predicted_value'],
-                    'edge': pred['edge'],
-                    'model_version': pred['model_version']
+                    'over_probability': prop.pred_over_probability,
+                    'under_probability': prop.pred_under_probability,
+                    'predicted_value': prop.pred_predicted_value,
+                    'edge': prop.pred_edge,
+                    'model_version': prop.pred_model_version
                 }
             market_groups[prop.market_key]['lines'].append(line)
         
@@ -222,23 +259,30 @@ def game_props(request, game_id: str):
         return fetch_from_api_fallback(game_id, game, markets_csv)
 
 
-def fetch_from_api_fallback(game_id: str, game: dict, markets_csv: str):
+def fetch_from_api_fallback(game_id: str, game: dict, markets_csv: str, event=None):
     """Fallback to API when database doesn't have data"""
     try:
         resolved = None
-        odds_map = OddsEventMap.objects.filter(game_id=game_id).first()
-        if odds_map:
-            resolved = odds_map.odds_event_id
+        odds_map = None
+        if event is not None:
+            # Caller already resolved the event; no OddsEventMap round-trip
+            resolved = event.event_id
+        else:
+            odds_map = OddsEventMap.objects.filter(game_id=game_id).first()
+            if odds_map:
+                resolved = odds_map.odds_event_id
 
         if not resolved:
             try:
                 event_id, ev_json = resolve_odds_event_id(game)
                 resolved = event_id
-                if odds_map:
-                    odds_map.odds_event_id = event_id
-                    odds_map.save(update_fields=["odds_event_id", "last_checked_at"])
-                else:
-                    OddsEventMap.objects.create(game_id=game_id, odds_event_id=event_id)
+                # Single INSERT ... ON CONFLICT DO UPDATE upsert
+                OddsEventMap.objects.bulk_create(
+                    [OddsEventMap(game_id=game_id, odds_event_id=event_id)],
+                    update_conflicts=True,
+                    update_fields=["odds_event_id", "last_checked_at"],
+                    unique_fields=["game_id"],
+                )
             except Exception as e:
                 logger.info("props_resolve_failed", extra={"game_id": game_id})
                 return JsonResponse({"error": "odds_event_not_found"}, status=404)
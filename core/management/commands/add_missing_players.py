@@ -19,7 +19,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         self.stdout.write("Adding missing players with correct 2025 team assignments...")
-        
+
         # Manually curated list of missing players with their correct 2025 teams
         missing_players = {
             'AJ Brown': {'team_abbr': 'PHI', 'position': 'WR'},
@@ -29,66 +29,77 @@ class Command(BaseCommand):
             'Chigoziem Okonkwo': {'team_abbr': 'TEN', 'position': 'TE'},
             'Brian Thomas Jr': {'team_abbr': 'JAX', 'position': 'WR'},  # Rookie WR
         }
-        
+
         updated_count = 0
         created_teams_count = 0
         errors_count = 0
 
-        for player_name, data in missing_players.items():
-            team_abbr = data['team_abbr']
-            position = data['position']
-            
-            try:
-                with transaction.atomic():
-                    # Get or create team
-                    team_obj, team_created = Team.objects.get_or_create(
-                        team_abbr=team_abbr,
-                        defaults={'team_name': team_abbr, 'team_city': team_abbr}
-                    )
-                    if team_created:
-                        created_teams_count += 1
+        try:
+            with transaction.atomic():
+                # Batch-create any missing teams in one statement
+                wanted_teams = {d['team_abbr'] for d in missing_players.values()}
+                teams = Team.objects.filter(team_abbr__in=wanted_teams).in_bulk(field_name='team_abbr')
+                missing_teams = [
+                    Team(team_abbr=abbr, team_name=abbr, team_city=abbr)
+                    for abbr in wanted_teams if abbr not in teams
+                ]
+                if missing_teams:
+                    created_teams_count = len(missing_teams)
+                    if not dry_run:
+                        Team.objects.bulk_create(missing_teams, ignore_conflicts=True)
+                        teams = Team.objects.filter(team_abbr__in=wanted_teams).in_bulk(field_name='team_abbr')
 
-                    # Get or create player
-                    player, player_created = Player.objects.get_or_create(
-                        player_name=player_name,
-                        defaults={
-                            'player_id': player_name.lower().replace(' ', '_').replace('.', '').replace(' Jr', ''),
-                            'position': position,
-                            'team': team_obj
-                        }
-                    )
-                    
-                    if not player_created:
-                        # Player exists, update team and position
-                        old_team_abbr = player.team.team_abbr if player.team else "None"
-                        old_position = player.position
-                        
-                        if player.team != team_obj or player.position != position:
-                            if dry_run:
-                                self.stdout.write(f"Would update {player_name}:")
-                                if player.team != team_obj:
-                                    self.stdout.write(f"  Team: {old_team_abbr} → {team_abbr}")
-                                if player.position != position:
-                                    self.stdout.write(f"  Position: {old_position} → {position}")
-                            else:
-                                player.team = team_obj
-                                player.position = position
-                                player.save()
-                                updated_count += 1
-                                self.stdout.write(f"Updated {player_name}: {old_team_abbr} → {team_abbr}, {old_position} → {position}")
-                        else:
-                            self.stdout.write(f"{player_name} already correct: {team_abbr} {position}")
+                existing = Player.objects.filter(player_name__in=missing_players).in_bulk(field_name='player_name')
+
+                # Batch-create missing players in one statement
+                new_players = []
+                for player_name, data in missing_players.items():
+                    if player_name in existing:
+                        continue
+                    if dry_run:
+                        self.stdout.write(f"Would create {player_name}: {data['team_abbr']} {data['position']}")
                     else:
+                        new_players.append(Player(
+                            player_name=player_name,
+                            player_id=player_name.lower().replace(' ', '_').replace('.', '').replace(' Jr', ''),
+                            position=data['position'],
+                            team=teams.get(data['team_abbr'])
+                        ))
+                        self.stdout.write(f"Created {player_name}: {data['team_abbr']} {data['position']}")
+                    updated_count += 1
+                if new_players:
+                    Player.objects.bulk_create(new_players, ignore_conflicts=True)
+
+                # Apply corrections with one UPDATE per (team, position) group
+                corrections = {}
+                for player_name, data in missing_players.items():
+                    player = existing.get(player_name)
+                    if player is None:
+                        continue
+                    team_obj = teams.get(data['team_abbr'])
+                    old_team_abbr = player.team.team_abbr if player.team else "None"
+                    if player.team_id != (team_obj.id if team_obj else None) or player.position != data['position']:
                         if dry_run:
-                            self.stdout.write(f"Would create {player_name}: {team_abbr} {position}")
+                            self.stdout.write(f"Would update {player_name}:")
+                            if player.team_id != (team_obj.id if team_obj else None):
+                                self.stdout.write(f"  Team: {old_team_abbr} → {data['team_abbr']}")
+                            if player.position != data['position']:
+                                self.stdout.write(f"  Position: {player.position} → {data['position']}")
                         else:
-                            self.stdout.write(f"Created {player_name}: {team_abbr} {position}")
-                            updated_count += 1
+                            corrections.setdefault((data['team_abbr'], data['position']), []).append(player_name)
+                            self.stdout.write(f"Updated {player_name}: {old_team_abbr} → {data['team_abbr']}, {player.position} → {data['position']}")
+                        updated_count += 1
+                    else:
+                        self.stdout.write(f"{player_name} already correct: {data['team_abbr']} {data['position']}")
+
+                for (team_abbr, position), names in corrections.items():
+                    Player.objects.filter(player_name__in=names).update(
+                        team=teams.get(team_abbr), position=position
+                    )
 
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"Error processing {player_name}: {e}"))
-                errors_count += 1
-                continue
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error processing players: {e}"))
+            errors_count += 1
 
         if dry_run:
             self.stdout.write(self.style.WARNING(f"DRY RUN - Would update/create {updated_count} players, create {created_teams_count} teams, {errors_count} errors"))
@@ -3,8 +3,7 @@
 Calculate Closing Line Value (CLV) for prop lines
 """
 from django.core.management.base import BaseCommand
-from core.models import PropLineHistory
-from django.db import connection
+from django.db import connection, transaction
 from django.utils import timezone
 
 
@@ -27,18 +26,36 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be calculated without actually updating',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per round trip on the dry-run cursor',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
+        verbose = options.get('verbosity', 1) >= 2
         game_id = options.get('game_id')
         market = options.get('market')
         
         if dry_run:
             self.stdout.write("DRY RUN - No CLV will be calculated")
         
-        # Build the CLV calculation query
-        query = """
-        WITH line_movements AS (
+        # Push --game-id/--market down into the CTE scan so only the
+        # relevant partitions get sorted
+        cte_filters = ""
+        params = []
+        if game_id:
+            cte_filters += " AND plh.game_id = %s"
+            params.append(game_id)
+        if market:
+            cte_filters += " AND plh.market_key = %s"
+            params.append(market)
+
+        # Shared CTE computing opening/closing/our-capture markers
+        cte = """
+        WITH window_stats AS (
           SELECT 
             plh.game_id,
             plh.player_name,
@@ -46,114 +63,93 @@ class Command(BaseCommand):
             plh.line_value,
             plh.captured_at,
             plh.id,
-            -- Find opening line (earliest)
-            FIRST_VALUE(plh.line_value) OVER (
-              PARTITION BY plh.game_id, plh.player_name, plh.market_key 
-              ORDER BY plh.captured_at ASC
-            ) AS opening_line,
-            -- Find closing line (latest before kickoff)
-            LAST_VALUE(plh.line_value) OVER (
-              PARTITION BY plh.game_id, plh.player_name, plh.market_key 
-              ORDER BY plh.captured_at ASC
-              ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
-            ) AS closing_line,
-            -- Mark our capture time (you can adjust this logic)
-            CASE 
-              WHEN plh.captured_at = (
-                SELECT MAX(plh2.captured_at) 
-                FROM core_proplinehistory plh2 
-                WHERE plh2.game_id = plh.game_id 
-                  AND plh2.player_name = plh.player_name 
-                  AND plh2.market_key = plh.market_key
-                  AND plh2.captured_at <= NOW() - INTERVAL '1 hour'
-              ) THEN TRUE 
-              ELSE FALSE 
-            END AS is_our_capture,
-            -- Mark opening line
-            plh.captured_at = (
-              SELECT MIN(plh3.captured_at) 
-              FROM core_proplinehistory plh3 
-              WHERE plh3.game_id = plh.game_id 
-                AND plh3.player_name = plh.player_name 
-                AND plh3.market_key = plh.market_key
-            ) AS is_opening,
-            -- Mark closing line
-            plh.captured_at = (
-              SELECT MAX(plh4.captured_at) 
-              FROM core_proplinehistory plh4 
-              WHERE plh4.game_id = plh.game_id 
-                AND plh4.player_name = plh.player_name 
-                AND plh4.market_key = plh.market_key
-            ) AS is_closing
+            -- One shared window: a single sort feeds every marker column
+            FIRST_VALUE(plh.line_value) OVER w AS opening_line,
+            LAST_VALUE(plh.line_value) OVER w AS closing_line,
+            MIN(plh.captured_at) OVER w AS min_ts,
+            MAX(plh.captured_at) OVER w AS max_ts,
+            MAX(plh.captured_at) FILTER (
+              WHERE plh.captured_at <= NOW() - INTERVAL '1 hour'
+            ) OVER w AS our_ts
           FROM core_proplinehistory plh
+          WHERE TRUE""" + cte_filters + """
+          WINDOW w AS (
+            PARTITION BY plh.game_id, plh.player_name, plh.market_key
+            ORDER BY plh.captured_at ASC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+          )
+        ),
+        line_movements AS (
+          SELECT 
+            ws.*,
+            ws.captured_at = ws.min_ts AS is_opening,
+            ws.captured_at = ws.max_ts AS is_closing,
+            COALESCE(ws.captured_at = ws.our_ts, FALSE) AS is_our_capture
+          FROM window_stats ws
         )
-        SELECT 
-          lm.game_id,
-          lm.player_name,
-          lm.market_key,
-          lm.line_value,
-          lm.captured_at,
-          lm.id,
-          lm.opening_line,
-          lm.closing_line,
-          lm.is_our_capture,
-          lm.is_opening,
-          lm.is_closing,
-          -- Calculate CLV
-          lm.line_value - lm.opening_line AS clv_vs_opening,
-          lm.line_value - lm.closing_line AS clv_vs_closing
-        FROM line_movements lm
         """
-        
-        params = []
-        if game_id:
-            query += " WHERE lm.game_id = %s"
-            params.append(game_id)
-        
-        if market:
-            if game_id:
-                query += " AND lm.market_key = %s"
-            else:
-                query += " WHERE lm.market_key = %s"
-            params.append(market)
-        
-        query += " ORDER BY lm.game_id, lm.player_name, lm.market_key, lm.captured_at"
-        
-        with connection.cursor() as cursor:
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-        
-        self.stdout.write(f"Found {len(results)} prop lines to calculate CLV for")
-        
-        updated_count = 0
-        
-        for row in results:
-            (game_id, player_name, market_key, line_value, captured_at, 
-             plh_id, opening_line, closing_line, is_our_capture, 
-             is_opening, is_closing, clv_vs_opening, clv_vs_closing) = row
-            
-            if not dry_run:
-                try:
-                    plh = PropLineHistory.objects.get(id=plh_id)
-                    plh.is_opening_line = is_opening
-                    plh.is_closing_line = is_closing
-                    plh.is_our_capture = is_our_capture
-                    plh.clv_vs_opening = clv_vs_opening
-                    plh.clv_vs_closing = clv_vs_closing
-                    plh.save()
-                    updated_count += 1
-                except PropLineHistory.DoesNotExist:
-                    self.stdout.write(f"Warning: PropLineHistory {plh_id} not found")
-                    continue
-            else:
-                updated_count += 1
-            
-            self.stdout.write(
-                f"{player_name} {market_key}: Line={line_value}, "
-                f"Opening={opening_line}, Closing={closing_line}, "
-                f"CLV vs Opening={clv_vs_opening:.1f}, CLV vs Closing={clv_vs_closing:.1f}"
-            )
-        
+
+        if dry_run:
+            # Preview path: ship rows to Python and print them
+            query = cte + """
+            SELECT 
+              lm.game_id,
+              lm.player_name,
+              lm.market_key,
+              lm.line_value,
+              lm.captured_at,
+              lm.id,
+              lm.opening_line,
+              lm.closing_line,
+              lm.is_our_capture,
+              lm.is_opening,
+              lm.is_closing,
+              -- Calculate CLV
+              lm.line_value - lm.opening_line AS clv_vs_opening,
+              lm.line_value - lm.closing_line AS clv_vs_closing
+            FROM line_movements lm
+            ORDER BY lm.game_id, lm.player_name, lm.market_key, lm.captured_at
+            """
+            updated_count = 0
+            # Named (server-side) cursor: rows stream over in itersize pages,
+            # so neither Postgres nor Python materializes the full result.
+            # DECLARE CURSOR needs a transaction block, which autocommit
+            # management commands don't provide on their own
+            connection.ensure_connection()
+            with transaction.atomic():
+                with connection.connection.cursor(name='calculate_clv_dry_run') as cursor:
+                    cursor.itersize = options['batch_size']
+                    cursor.execute(query, params)
+                    for row in cursor:
+                        updated_count += 1
+                        if not verbose:
+                            continue
+                        (game_id, player_name, market_key, line_value, captured_at,
+                         plh_id, opening_line, closing_line, is_our_capture,
+                         is_opening, is_closing, clv_vs_opening, clv_vs_closing) = row
+                        self.stdout.write(
+                            f"{player_name} {market_key}: Line={line_value}, "
+                            f"Opening={opening_line}, Closing={closing_line}, "
+                            f"CLV vs Opening={clv_vs_opening:.1f}, CLV vs Closing={clv_vs_closing:.1f}"
+                        )
+
+            self.stdout.write(f"Found {updated_count} prop lines to calculate CLV for")
+        else:
+            # Real run: fold the update into the CTE so nothing crosses the wire
+            query = cte + """
+            UPDATE core_proplinehistory AS plh SET
+              is_opening_line = lm.is_opening,
+              is_closing_line = lm.is_closing,
+              is_our_capture = lm.is_our_capture,
+              clv_vs_opening = lm.line_value - lm.opening_line,
+              clv_vs_closing = lm.line_value - lm.closing_line
+            FROM line_movements lm
+            WHERE plh.id = lm.id
+            """
+            with connection.cursor() as cursor:
+                cursor.execute(query, params)
+                updated_count = cursor.rowcount
+
         if dry_run:
             self.stdout.write(
                 self.style.SUCCESS(f"Would calculate CLV for {updated_count} prop lines")
@@ -3,8 +3,8 @@
 Clean up duplicate players by merging them based on PlayerMapping
 """
 from django.core.management.base import BaseCommand
-from core.models import Player, PlayerMapping, PlayerStats, Prediction
-from django.db import transaction
+from core.models import Player, PlayerMapping, PlayerStats, Prediction, Team
+from django.db import connection, transaction
 
 
 class Command(BaseCommand):
@@ -16,67 +16,111 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be cleaned up without actually doing it',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Merge pairs applied per transaction (smaller batches lose less work on a crash)',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
-        
+        verbose = options.get('verbosity', 1) >= 2
+        batch_size = options['batch_size']
+
         self.stdout.write("Analyzing duplicate players...")
-        
+
+        # Prefetch all teams once and create any the mappings reference up
+        # front, so the merge loop never writes teams; a dry run stays
+        # write-free and only reads the cache
+        team_cache = {t.team_abbr: t for t in Team.objects.all()}
+        needed_abbrs = set(
+            PlayerMapping.objects.exclude(current_team='UNK')
+            .values_list('current_team', flat=True)
+        )
+        missing_abbrs = needed_abbrs - set(team_cache)
+        if missing_abbrs and not dry_run:
+            Team.objects.bulk_create(
+                [Team(team_abbr=a, team_name=a, team_city=a) for a in missing_abbrs],
+                ignore_conflicts=True,
+            )
+            team_cache = {t.team_abbr: t for t in Team.objects.all()}
+
         # Find players that have mappings
         mapped_player_ids = set(PlayerMapping.objects.values_list('player_id', flat=True))
-        
+
         # Find duplicate players (same player_id or similar names)
         duplicates_found = 0
         merged_count = 0
-        
+
+        # Collect the merges first, then apply them with batched statements
+        pairs = []  # (duplicate_id, keeper_id)
+        keepers_to_update = []
+
         # Process each mapped player
         for player_id in mapped_player_ids:
             try:
                 mapping = PlayerMapping.objects.get(player_id=player_id)
-                
+
                 # Find the nflreadpy player (for stats)
                 nflreadpy_player = Player.objects.filter(player_name=mapping.nflreadpy_name).first()
-                
+
                 # Find the PrizePicks player (for predictions)
                 prizepicks_player = Player.objects.filter(player_name=mapping.prizepicks_name).first()
-                
+
                 if nflreadpy_player and prizepicks_player and nflreadpy_player.id != prizepicks_player.id:
                     duplicates_found += 1
-                    
+
                     if dry_run:
-                        self.stdout.write(f"Would merge: {nflreadpy_player.player_name} + {prizepicks_player.player_name} → {mapping.prizepicks_name}")
+                        if verbose:
+                            self.stdout.write(f"Would merge: {nflreadpy_player.player_name} + {prizepicks_player.player_name} → {mapping.prizepicks_name}")
                     else:
-                        # Merge the players
-                        with transaction.atomic():
-                            # Update all PlayerStats to point to the PrizePicks player
-                            PlayerStats.objects.filter(player=nflreadpy_player).update(player=prizepicks_player)
-                            
-                            # Update all Predictions to point to the PrizePicks player
-                            Prediction.objects.filter(player=nflreadpy_player).update(player=prizepicks_player)
-                            
-                            # Update the PrizePicks player with better info from mapping
-                            prizepicks_player.position = mapping.position
-                            if mapping.current_team != 'UNK':
-                                from core.models import Team
-                                team, _ = Team.objects.get_or_create(
-                                    team_abbr=mapping.current_team,
-                                    defaults={'team_name': mapping.current_team, 'team_city': mapping.current_team}
-                                )
-                                prizepicks_player.team = team
-                            prizepicks_player.save()
-                            
-                            # Delete the nflreadpy player
-                            nflreadpy_player.delete()
-                            
-                            merged_count += 1
+                        pairs.append((nflreadpy_player.id, prizepicks_player.id))
+
+                        # Update the PrizePicks player with better info from mapping
+                        prizepicks_player.position = mapping.position
+                        if mapping.current_team != 'UNK':
+                            prizepicks_player.team = team_cache[mapping.current_team]
+                        keepers_to_update.append(prizepicks_player)
+
+                        merged_count += 1
+                        if verbose:
                             self.stdout.write(f"Merged: {nflreadpy_player.player_name} + {prizepicks_player.player_name} → {mapping.prizepicks_name}")
-                
+
             except PlayerMapping.DoesNotExist:
                 continue
             except Exception as e:
                 self.stdout.write(f"Error processing {player_id}: {e}")
                 continue
-        
+
+        if pairs:
+            # One batched UPDATE per table instead of four statements per pair,
+            # applied batch_size pairs at a time in their own transaction so a
+            # crash mid-run keeps the batches already committed
+            from psycopg2.extras import execute_values
+            for start in range(0, len(pairs), batch_size):
+                batch = pairs[start:start + batch_size]
+                keepers = keepers_to_update[start:start + batch_size]
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        # Repoint PlayerStats rows at the keeper players
+                        execute_values(
+                            cursor,
+                            "UPDATE core_playerstats SET player_id = m.new_id "
+                            "FROM (VALUES %s) AS m(old_id, new_id) WHERE player_id = m.old_id",
+                            batch,
+                        )
+                        # Repoint Prediction rows at the keeper players
+                        execute_values(
+                            cursor,
+                            "UPDATE core_prediction SET player_id = m.new_id "
+                            "FROM (VALUES %s) AS m(old_id, new_id) WHERE player_id = m.old_id",
+                            batch,
+                        )
+                    Player.objects.bulk_update(keepers, ['position', 'team'])
+                    # Delete the merged-away nflreadpy players in one statement
+                    Player.objects.filter(id__in=[old_id for old_id, _ in batch]).delete()
+
         if dry_run:
             self.stdout.write(f"DRY RUN - Found {duplicates_found} duplicate pairs that would be merged")
         else:
@@ -20,79 +20,102 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
+        verbose = options.get('verbosity', 1) >= 2
         
         self.stdout.write("Loading nflreadpy player data...")
         players = nfl.load_players()
         self.stdout.write(f"Loaded {len(players)} players from nflreadpy")
-        
+
+        # Hash-join: one pass over the frame instead of a full scan per mapping
+        player_lookup = dict(zip(
+            players['display_name'].to_list(),
+            zip(players['latest_team'].to_list(), players['position'].to_list()),
+        ))
+
         self.stdout.write("Fixing player mappings...")
+
+        # Prefetch all teams once; only cache misses hit the DB
+        team_cache = {t.team_abbr: t for t in Team.objects.all()}
         
         updated_mappings = 0
         updated_players = 0
+        mappings_to_update = []
+        players_to_update = []
         created_teams = 0
         errors = 0
         
         # Get all active mappings
         mappings = PlayerMapping.objects.filter(is_active=True)
         
-        for mapping in mappings:
-            try:
-                # Find the player in nflreadpy data
-                nfl_player = players.filter(players['display_name'] == mapping.nflreadpy_name).to_pandas()
-                
-                if nfl_player.empty:
-                    self.stdout.write(f"Player not found in nflreadpy: {mapping.nflreadpy_name}")
-                    errors += 1
-                    continue
-                
-                nfl_data = nfl_player.iloc[0]
-                correct_team = nfl_data['latest_team']
-                correct_position = nfl_data['position']
+        # One transaction for the whole run: a single COMMIT instead of one per row
+        with transaction.atomic():
+            for mapping in mappings:
+                try:
+                    # Find the player in nflreadpy data
+                    nfl_data = player_lookup.get(mapping.nflreadpy_name)
+
+                    if nfl_data is None:
+                        self.stdout.write(f"Player not found in nflreadpy: {mapping.nflreadpy_name}")
+                        errors += 1
+                        continue
+
+                    correct_team, correct_position = nfl_data
                 
-                # Check if mapping needs updating
-                if (mapping.current_team != correct_team or 
-                    mapping.position != correct_position):
+                    # Check if mapping needs updating
+                    if (mapping.current_team != correct_team or 
+                        mapping.position != correct_position):
                     
-                    if dry_run:
-                        self.stdout.write(f"Would update {mapping.prizepicks_name}:")
-                        self.stdout.write(f"  Team: {mapping.current_team} → {correct_team}")
-                        self.stdout.write(f"  Position: {mapping.position} → {correct_position}")
-                    else:
-                        # Update mapping
-                        mapping.current_team = correct_team
-                        mapping.position = correct_position
-                        mapping.save()
-                        updated_mappings += 1
+                        if dry_run:
+                            if verbose:
+                                self.stdout.write(f"Would update {mapping.prizepicks_name}:")
+                                self.stdout.write(f"  Team: {mapping.current_team} → {correct_team}")
+                                self.stdout.write(f"  Position: {mapping.position} → {correct_position}")
+                        else:
+                            # Update mapping in memory; flushed via bulk_update
+                            mapping.current_team = correct_team
+                            mapping.position = correct_position
+                            mappings_to_update.append(mapping)
+                            updated_mappings += 1
+                            if len(mappings_to_update) >= 1000:
+                                PlayerMapping.objects.bulk_update(mappings_to_update, ['current_team', 'position'])
+                                mappings_to_update.clear()
                         
-                        # Update player
-                        player = Player.objects.filter(player_name=mapping.prizepicks_name).first()
-                        if player:
-                            # Get or create the correct team
-                            team, team_created = Team.objects.get_or_create(
-                                team_abbr=correct_team,
-                                defaults={
-                                    'team_name': correct_team,
-                                    'team_city': correct_team
-                                }
-                            )
-                            
-                            if team_created:
-                                created_teams += 1
+                            # Update player
+                            player = Player.objects.filter(player_name=mapping.prizepicks_name).first()
+                            if player:
+                                # Get or create the correct team via the cache
+                                team = team_cache.get(correct_team)
+                                if team is None:
+                                    team = Team.objects.create(
+                                        team_abbr=correct_team,
+                                        team_name=correct_team,
+                                        team_city=correct_team,
+                                    )
+                                    team_cache[correct_team] = team
+                                    created_teams += 1
                             
-                            # Update player's team and position
-                            player.team = team
-                            player.position = correct_position
-                            player.save()
-                            updated_players += 1
+                                # Update player's team and position
+                                player.team = team
+                                player.position = correct_position
+                                players_to_update.append(player)
+                                updated_players += 1
+                                if len(players_to_update) >= 1000:
+                                    Player.objects.bulk_update(players_to_update, ['team', 'position'])
+                                    players_to_update.clear()
                             
-                            if updated_players % 10 == 0:
-                                self.stdout.write(f"Updated {updated_players} players...")
+                                if updated_players % 10 == 0:
+                                    self.stdout.write(f"Updated {updated_players} players...")
                 
-            except Exception as e:
-                self.stdout.write(f"Error updating {mapping.prizepicks_name}: {e}")
-                errors += 1
-                continue
+                except Exception as e:
+                    self.stdout.write(f"Error updating {mapping.prizepicks_name}: {e}")
+                    errors += 1
+                    continue
         
+            if mappings_to_update:
+                PlayerMapping.objects.bulk_update(mappings_to_update, ['current_team', 'position'])
+            if players_to_update:
+                Player.objects.bulk_update(players_to_update, ['team', 'position'])
+
         if dry_run:
             self.stdout.write(f"DRY RUN - Would update {updated_mappings} mappings and {updated_players} players, create {created_teams} teams")
         else:
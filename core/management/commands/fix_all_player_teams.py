@@ -17,9 +17,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be updated without actually doing it',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Players updated per transaction (smaller batches lose less work on a crash)',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
+        verbose = options.get('verbosity', 1) >= 2
+        batch_size = options['batch_size']
         self.stdout.write("Loading nflreadpy player data...")
         
         try:
@@ -30,9 +38,13 @@ class Command(BaseCommand):
             return
 
         self.stdout.write("Fixing player team assignments...")
+
+        # Prefetch all teams once; only cache misses hit the DB
+        team_cache = {t.team_abbr: t for t in Team.objects.all()}
         
         updated_count = 0
         created_teams_count = 0
+        players_to_update = []
         errors_count = 0
         not_found_count = 0
 
@@ -42,41 +54,66 @@ class Command(BaseCommand):
         
         self.stdout.write(f"Found {len(active_player_names)} players with props")
 
+        # One query for every player we might touch, with the team row joined
+        # in so the old-team comparison never lazy-loads
+        db_players = {
+            p.player_name: p
+            for p in Player.objects.filter(
+                player_name__in=active_player_names
+            ).select_related('team')
+        }
+
+        # Semi-join the nflreadpy frame against the active names once, then
+        # drive the loop from plain dict lookups. The last-name fallback dict
+        # is built from the full frame since it matches names that differ.
+        names_df = pl.DataFrame({'display_name': list(active_player_names)})
+        matched = nfl_players_df.join(names_df, on='display_name', how='semi')
+        player_lookup = dict(zip(
+            matched['display_name'].to_list(),
+            zip(matched['latest_team'].to_list(), matched['position'].to_list()),
+        ))
+        last_name_lookup = {}
+        for name, team, pos in zip(
+            nfl_players_df['display_name'].to_list(),
+            nfl_players_df['latest_team'].to_list(),
+            nfl_players_df['position'].to_list(),
+        ):
+            last_name_lookup.setdefault(name.split()[-1], (team, pos))
+
+        # One sub-transaction per batch: a crash loses at most batch_size
+        # updates instead of the whole run
         for player_name in active_player_names:
             try:
                 # Find the player in our database
-                player = Player.objects.filter(player_name=player_name).first()
+                player = db_players.get(player_name)
                 if not player:
                     self.stdout.write(self.style.WARNING(f"  Player '{player_name}' not found in Player table. Skipping."))
                     not_found_count += 1
                     continue
 
                 # Find the corresponding player in nflreadpy data
-                nfl_player_data = nfl_players_df.filter(
-                    pl.col('display_name') == player_name
-                )
+                nfl_data = player_lookup.get(player_name)
 
-                if nfl_player_data.height == 0:
+                if nfl_data is None:
                     # Try alternative name matching
-                    nfl_player_data = nfl_players_df.filter(
-                        pl.col('display_name').str.contains(player_name.split()[-1], literal=True)
-                    )
-                    
-                    if nfl_player_data.height == 0:
+                    nfl_data = last_name_lookup.get(player_name.split()[-1])
+
+                    if nfl_data is None:
                         self.stdout.write(self.style.WARNING(f"  NFLReadPy player '{player_name}' not found. Skipping."))
                         not_found_count += 1
                         continue
 
-                nfl_data = nfl_player_data.row(0, named=True)
-                latest_team_abbr = nfl_data['latest_team']
-                latest_position = nfl_data['position']
+                latest_team_abbr, latest_position = nfl_data
 
-                # Get or create team
-                team_obj, team_created = Team.objects.get_or_create(
-                    team_abbr=latest_team_abbr,
-                    defaults={'team_name': latest_team_abbr, 'team_city': latest_team_abbr}
-                )
-                if team_created:
+                # Get or create team via the prefetched cache
+                team_obj = team_cache.get(latest_team_abbr)
+                if team_obj is None:
+                    team_obj = Team.objects.create(
+                        team_abbr=latest_team_abbr,
+                        team_name=latest_team_abbr,
+                        team_city=latest_team_abbr,
+                    )
+                    team_cache[latest_team_abbr] = team_obj
                     created_teams_count += 1
 
                 # Check if player needs update
@@ -91,18 +128,26 @@ class Command(BaseCommand):
 
                 if needs_update:
                     if dry_run:
-                        self.stdout.write(f"Would update {player_name}:")
-                        if player.team != team_obj:
-                            self.stdout.write(f"  Team: {old_team_abbr} → {latest_team_abbr}")
-                        if player.position != latest_position:
-                            self.stdout.write(f"  Position: {old_position} → {latest_position}")
+                        if verbose:
+                            self.stdout.write(f"Would update {player_name}:")
+                            if player.team != team_obj:
+                                self.stdout.write(f"  Team: {old_team_abbr} → {latest_team_abbr}")
+                            if player.position != latest_position:
+                                self.stdout.write(f"  Position: {old_position} → {latest_position}")
                     else:
-                        with transaction.atomic():
-                            player.team = team_obj
-                            player.position = latest_position
-                            player.save()
-                            updated_count += 1
+                        # Mutate in memory; flushed in batches via bulk_update
+                        player.team = team_obj
+                        player.position = latest_position
+                        players_to_update.append(player)
+                        updated_count += 1
+                        if verbose:
                             self.stdout.write(f"Updated {player_name}: {old_team_abbr} → {latest_team_abbr}, {old_position} → {latest_position}")
+                        elif updated_count % 500 == 0:
+                            self.stdout.write(f"Updated {updated_count} players...")
+                        if len(players_to_update) >= batch_size:
+                            with transaction.atomic():
+                                Player.objects.bulk_update(players_to_update, ['team', 'position'])
+                            players_to_update.clear()
                 else:
                     # Player is already correct
                     pass
@@ -112,6 +157,10 @@ class Command(BaseCommand):
                 errors_count += 1
                 continue
 
+        if players_to_update:
+            with transaction.atomic():
+                Player.objects.bulk_update(players_to_update, ['team', 'position'])
+
         if dry_run:
             self.stdout.write(self.style.WARNING(f"DRY RUN - Would update {updated_count} players, create {created_teams_count} teams, {not_found_count} not found, {errors_count} errors"))
         else:
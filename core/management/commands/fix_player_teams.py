@@ -19,55 +19,71 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
+        verbose = options.get('verbosity', 1) >= 2
         
         self.stdout.write("Fixing player team assignments...")
+
+        # Prefetch all teams once; only cache misses hit the DB
+        team_cache = {t.team_abbr: t for t in Team.objects.all()}
         
         updated_count = 0
         created_teams = 0
         
         # Get all active mappings
-        mappings = PlayerMapping.objects.filter(is_active=True)
+        mappings = list(PlayerMapping.objects.filter(is_active=True))
+
+        # One query for every mapped player, with the team row joined in so
+        # the old-team comparison never lazy-loads
+        db_players = {
+            p.player_name: p
+            for p in Player.objects.filter(
+                player_name__in=[m.prizepicks_name for m in mappings]
+            ).select_related('team')
+        }
         
-        for mapping in mappings:
-            try:
-                # Find the player by PrizePicks name
-                player = Player.objects.filter(player_name=mapping.prizepicks_name).first()
+        # One transaction for the whole run: a single COMMIT instead of one per row
+        with transaction.atomic():
+            for mapping in mappings:
+                try:
+                    # Find the player by PrizePicks name
+                    player = db_players.get(mapping.prizepicks_name)
                 
-                if not player:
-                    self.stdout.write(f"Player not found: {mapping.prizepicks_name}")
-                    continue
+                    if not player:
+                        self.stdout.write(f"Player not found: {mapping.prizepicks_name}")
+                        continue
                 
-                # Get or create the correct team
-                team, team_created = Team.objects.get_or_create(
-                    team_abbr=mapping.current_team,
-                    defaults={
-                        'team_name': mapping.current_team,
-                        'team_city': mapping.current_team
-                    }
-                )
+                    # Get or create the correct team via the cache
+                    team = team_cache.get(mapping.current_team)
+                    if team is None:
+                        team = Team.objects.create(
+                            team_abbr=mapping.current_team,
+                            team_name=mapping.current_team,
+                            team_city=mapping.current_team,
+                        )
+                        team_cache[mapping.current_team] = team
+                        created_teams += 1
+                        self.stdout.write(f"Created team: {mapping.current_team}")
                 
-                if team_created:
-                    created_teams += 1
-                    self.stdout.write(f"Created team: {mapping.current_team}")
+                    # Update player's team and position
+                    old_team = player.team.team_abbr if player.team else "None"
+                    old_position = player.position
                 
-                # Update player's team and position
-                old_team = player.team.team_abbr if player.team else "None"
-                old_position = player.position
-                
-                if dry_run:
-                    self.stdout.write(f"Would update {player.player_name}: {old_team} → {mapping.current_team}, {old_position} → {mapping.position}")
-                else:
-                    player.team = team
-                    player.position = mapping.position
-                    player.save()
+                    if dry_run:
+                        if verbose:
+                            self.stdout.write(f"Would update {player.player_name}: {old_team} → {mapping.current_team}, {old_position} → {mapping.position}")
+                    else:
+                        player.team = team
+                        player.position = mapping.position
+                        # Restrict the UPDATE to the two changed columns
+                        player.save(update_fields=['team', 'position'])
                     
-                    updated_count += 1
-                    if updated_count % 10 == 0:
-                        self.stdout.write(f"Updated {updated_count} players...")
+                        updated_count += 1
+                        if updated_count % 10 == 0:
+                            self.stdout.write(f"Updated {updated_count} players...")
                 
-            except Exception as e:
-                self.stdout.write(f"Error updating {mapping.prizepicks_name}: {e}")
-                continue
+                except Exception as e:
+                    self.stdout.write(f"Error updating {mapping.prizepicks_name}: {e}")
+                    continue
         
         if dry_run:
             self.stdout.write(f"DRY RUN - Would update {updated_count} players and create {created_teams} teams")
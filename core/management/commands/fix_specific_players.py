@@ -6,6 +6,30 @@ from django.core.management.base import BaseCommand
 from core.models import PlayerMapping, Player, Team
 from django.db import transaction
 
+# Built once at import time; one translate pass replaces the chained
+# str.replace calls
+_SLUG_TABLE = str.maketrans({' ': '_', '.': ''})
+
+
+def _slugify(name):
+    """Build a player_id slug like 'michael_pittman_jr' from a display name"""
+    return name.lower().translate(_SLUG_TABLE)
+
+
+# Correct team assignments: (prizepicks_name, nflreadpy_name, correct_team, correct_position)
+PLAYER_FIXES = (
+    ('Daniel Jones', 'Daniel Jones', 'NYG', 'QB'),  # nflreadpy has him as IND but he's NYG
+    ('Jonathan Taylor', 'Jonathan Taylor', 'IND', 'RB'),
+    ('Josh Downs', 'Josh Downs', 'IND', 'WR'),
+    ('Tony Pollard', 'Tony Pollard', 'TEN', 'RB'),
+    ('Tyler Lockett', 'Tyler Lockett', 'TEN', 'WR'),
+    ('Calvin Ridley', 'Calvin Ridley', 'TEN', 'WR'),
+    ('Elic Ayomanor', 'Elic Ayomanor', 'TEN', 'WR'),
+    ('Tyler Warren', 'Tyler Warren', 'IND', 'TE'),
+    ('Michael Pittman Jr.', 'Michael Pittman Jr.', 'IND', 'WR'),  # Not in nflreadpy but should be IND
+    ('Chigoziem Okonkwo', 'Chigoziem Okonkwo', 'TEN', 'TE'),  # Not in nflreadpy but should be TEN
+)
+
 
 class Command(BaseCommand):
     help = 'Fix specific players with correct team assignments'
@@ -13,75 +37,92 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write("Fixing specific player team assignments...")
         
-        # Define correct team assignments
-        player_fixes = [
-            # (prizepicks_name, nflreadpy_name, correct_team, correct_position)
-            ('Daniel Jones', 'Daniel Jones', 'NYG', 'QB'),  # nflreadpy has him as IND but he's NYG
-            ('Jonathan Taylor', 'Jonathan Taylor', 'IND', 'RB'),
-            ('Josh Downs', 'Josh Downs', 'IND', 'WR'),
-            ('Tony Pollard', 'Tony Pollard', 'TEN', 'RB'),
-            ('Tyler Lockett', 'Tyler Lockett', 'TEN', 'WR'),
-            ('Calvin Ridley', 'Calvin Ridley', 'TEN', 'WR'),
-            ('Elic Ayomanor', 'Elic Ayomanor', 'TEN', 'WR'),
-            ('Tyler Warren', 'Tyler Warren', 'IND', 'TE'),
-            ('Michael Pittman Jr.', 'Michael Pittman Jr.', 'IND', 'WR'),  # Not in nflreadpy but should be IND
-            ('Chigoziem Okonkwo', 'Chigoziem Okonkwo', 'TEN', 'TE'),  # Not in nflreadpy but should be TEN
-        ]
-        
-        updated_count = 0
-        created_count = 0
-        
-        for prizepicks_name, nflreadpy_name, correct_team, correct_position in player_fixes:
-            try:
-                # Get or create mapping
-                mapping, created = PlayerMapping.objects.get_or_create(
-                    prizepicks_name=prizepicks_name,
-                    defaults={
-                        'nflreadpy_name': nflreadpy_name,
-                        'current_team': correct_team,
-                        'position': correct_position,
-                        'player_id': prizepicks_name.lower().replace(' ', '_').replace('.', '').replace(' Jr.', ''),
-                        'is_active': True
-                    }
+        # All writes commit once at the end of the block instead of once
+        # per statement
+        with transaction.atomic():
+            updated_count = 0
+            created_count = 0
+            # Per-row messages are buffered and flushed as one write at the end
+            log = []
+
+            # One INSERT ... ON CONFLICT (prizepicks_name) DO UPDATE writes
+            # every mapping; the uniq_pp_name constraint gives the conflict
+            # check an index to probe. The names-only SELECT just keeps the
+            # created counter honest.
+            existing_names = set(
+                PlayerMapping.objects.filter(
+                    prizepicks_name__in=[fix[0] for fix in PLAYER_FIXES]
+                ).values_list('prizepicks_name', flat=True)
+            )
+            created_count = sum(1 for fix in PLAYER_FIXES if fix[0] not in existing_names)
+            PlayerMapping.objects.bulk_create(
+                [
+                    PlayerMapping(
+                        prizepicks_name=prizepicks_name,
+                        nflreadpy_name=nflreadpy_name,
+                        current_team=correct_team,
+                        position=correct_position,
+                        player_id=_slugify(prizepicks_name),
+                        is_active=True,
+                    )
+                    for prizepicks_name, nflreadpy_name, correct_team, correct_position in PLAYER_FIXES
+                ],
+                update_conflicts=True,
+                unique_fields=['prizepicks_name'],
+                update_fields=['nflreadpy_name', 'current_team', 'position', 'is_active'],
+            )
+
+            # Only a handful of distinct teams appear in the fixes: resolve
+            # them once up front instead of a get_or_create per player
+            unique_abbrs = {fix[2] for fix in PLAYER_FIXES}
+            teams_by_abbr = {t.team_abbr: t for t in Team.objects.filter(team_abbr__in=unique_abbrs)}
+            missing_abbrs = unique_abbrs - teams_by_abbr.keys()
+            if missing_abbrs:
+                Team.objects.bulk_create(
+                    [Team(team_abbr=a, team_name=a, team_city=a) for a in missing_abbrs],
+                    ignore_conflicts=True,
                 )
-                
-                if not created:
-                    # Update existing mapping
-                    mapping.nflreadpy_name = nflreadpy_name
-                    mapping.current_team = correct_team
-                    mapping.position = correct_position
-                    mapping.is_active = True
-                    mapping.save()
-                
-                # Get or create team
-                team, team_created = Team.objects.get_or_create(
-                    team_abbr=correct_team,
-                    defaults={
-                        'team_name': correct_team,
-                        'team_city': correct_team
-                    }
+                teams_by_abbr = {t.team_abbr: t for t in Team.objects.filter(team_abbr__in=unique_abbrs)}
+
+            # One SELECT with the team joined in resolves every player; the team
+            # FK and position are then reassigned in memory and flushed with a
+            # single bulk_update
+            players_by_name = {
+                p.player_name: p
+                for p in Player.objects.filter(
+                    player_name__in=[fix[0] for fix in PLAYER_FIXES]
+                ).select_related('team').only(
+                    'player_name', 'position', 'team__team_abbr'
                 )
-                
+            }
+            players_to_update = []
+            # The fixes are static literals, so there is nothing per-row that
+            # can fail; any DB-level problem should roll back the whole batch
+            for prizepicks_name, nflreadpy_name, correct_team, correct_position in PLAYER_FIXES:
+                team = teams_by_abbr[correct_team]
+
                 # Update player
-                player = Player.objects.filter(player_name=prizepicks_name).first()
+                player = players_by_name.get(prizepicks_name)
                 if player:
+                    # Re-runs are the common case: skip rows already correct
+                    # instead of rewriting identical values
+                    if player.team_id == team.id and player.position == correct_position:
+                        continue
                     old_team = player.team.team_abbr if player.team else "None"
                     old_position = player.position
-                    
+
                     player.team = team
                     player.position = correct_position
-                    player.save()
-                    
-                    self.stdout.write(f"Updated {prizepicks_name}: {old_team} → {correct_team}, {old_position} → {correct_position}")
+                    players_to_update.append(player)
+
+                    log.append(f"Updated {prizepicks_name}: {old_team} → {correct_team}, {old_position} → {correct_position}")
                     updated_count += 1
                 else:
-                    self.stdout.write(f"Player not found: {prizepicks_name}")
-                
-                if created:
-                    created_count += 1
-                    
-            except Exception as e:
-                self.stdout.write(f"Error updating {prizepicks_name}: {e}")
-                continue
+                    log.append(f"Player not found: {prizepicks_name}")
+
+            if players_to_update:
+                Player.objects.bulk_update(players_to_update, ['team', 'position'], batch_size=500)
         
+        if log:
+            self.stdout.write('\n'.join(log))
         self.stdout.write(self.style.SUCCESS(f"Successfully updated {updated_count} players and created {created_count} mappings"))
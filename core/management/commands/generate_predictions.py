@@ -4,16 +4,163 @@ from django.utils import timezone
 from django.db.models import Avg, Q
 import numpy as np
 import pandas as pd
-import xgboost as xgb
-from sklearn.model_selection import TimeSeriesSplit
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-import joblib
-import os
-from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+
+# Columns averaged for the rolling and season-to-date feature blocks
+ROLLING_FEATURE_COLS = [
+    'passing_attempts', 'passing_completions', 'passing_yards', 'passing_tds',
+    'rushing_attempts', 'rushing_yards', 'rushing_tds',
+    'receiving_targets', 'receiving_receptions', 'receiving_yards', 'receiving_tds',
+    'air_yards', 'yac', 'adot', 'target_share', 'snap_share',
+]
+SEASON_FEATURE_COLS = ['passing_attempts', 'passing_yards', 'rushing_yards', 'receiving_yards']
+NEXTGEN_FEATURE_COLS = [
+    'avg_time_to_throw', 'avg_completed_air_yards', 'avg_intended_air_yards',
+    'avg_air_yards_differential', 'aggressiveness', 'completion_percentage_above_expectation',
+    'avg_cushion', 'avg_separation', 'avg_expected_yac', 'avg_yac_above_expectation',
+    'efficiency', 'avg_time_to_los', 'expected_rush_yards', 'rush_yards_over_expected',
+    'rush_yards_over_expected_per_att',
+]
+
+# Feature names for model interpretation, assembled once at import time in
+# the exact order create_advanced_feature_vector emits them
+_FEATURE_NAMES = tuple(
+    ROLLING_FEATURE_COLS
+    + [f'recent_avg_{f}' for f in ROLLING_FEATURE_COLS]
+    + [f'season_{f}' for f in SEASON_FEATURE_COLS]
+    + ['week', 'season', 'early_season', 'late_season']
+    + [
+        'opp_passing_def_rank', 'opp_rushing_def_rank', 'opp_receiving_def_rank', 'opp_overall_def_rank',
+        'opp_avg_passing_yards_allowed', 'opp_avg_rushing_yards_allowed', 'opp_avg_receiving_yards_allowed',
+        'opp_prop_specific_1', 'opp_prop_specific_2', 'opp_prop_specific_3',
+    ]
+    + [
+        'team_passing_yards', 'team_passing_attempts', 'team_passing_tds', 'team_passing_epa',
+        'team_passing_offense_rank', 'team_avg_passing_yards', 'team_rushing_yards', 'team_rushing_tds',
+        'team_rushing_epa', 'team_rushing_offense_rank',
+    ]
+    + [f'ngs_{f}' for f in [
+        'avg_time_to_throw', 'avg_completed_air_yards', 'avg_intended_air_yards',
+        'avg_air_yards_differential', 'aggressiveness', 'completion_pct_above_exp',
+        'avg_cushion', 'avg_separation', 'avg_expected_yac', 'avg_yac_above_expectation',
+        'efficiency', 'avg_time_to_los', 'expected_rush_yards', 'rush_yards_over_expected',
+        'rush_yards_over_expected_per_att',
+    ]]
+)
+
+def _build_defense_lut():
+    """Adjustment multiplier per defensive rank (1=best defense, 32=worst).
+
+    Better defense = lower prediction, with more aggressive scaling at both
+    extremes: 0.80-0.975 for top-8, 0.90-0.998 above average, 1.01-1.30
+    below average, 1.05-1.26 for bottom-8.
+    """
+    ranks = np.arange(1, 33)
+    out = np.where(
+        ranks <= 8, 0.80 + (ranks - 1) * 0.025,
+        np.where(
+            ranks >= 25, 1.05 + (32 - ranks) * 0.03,
+            np.where(
+                ranks <= 16, 0.90 + (ranks - 9) * 0.014,
+                1.01 + (ranks - 17) * 0.02,
+            ),
+        ),
+    )
+    return out.astype(np.float32)
+
+
+DEF_RANK_LUT = _build_defense_lut()
+
+# One PCG64 generator shared by the sampling paths; cheaper than building
+# a Generator per call and faster than the legacy np.random global
+_RNG = np.random.default_rng()
+
+# Prop type → PlayerStats column used to train its model
+STAT_FIELD_MAP = {
+    'player_pass_yds': 'passing_yards',
+    'player_rush_yds': 'rushing_yards',
+    'player_reception_yds': 'receiving_yards',
+    'player_pass_attempts': 'passing_attempts',
+    'player_rush_attempts': 'rushing_attempts',
+    'player_receptions': 'receiving_receptions',
+}
+
+
+def _resolve_market_key(market_display):
+    """Convert a display label like 'Pass Yards' to its market_key"""
+    lowered = market_display.lower()
+    market_key = lowered.replace(' ', '_').replace('yards', 'yds')
+    if 'pass' in lowered:
+        market_key = 'player_pass_yds' if 'yards' in lowered else 'player_pass_attempts'
+    elif 'rush' in lowered:
+        market_key = 'player_rush_yds' if 'yards' in lowered else 'player_rush_attempts'
+    elif 'reception' in lowered:
+        market_key = 'player_reception_yds' if 'yards' in lowered else 'player_receptions'
+    return market_key
+
+def train_simple_model(prop_type, df):
+    """Train one market's simple statistical model from a pre-filtered frame.
+
+    Standalone so joblib can ship it to worker processes; returns the model
+    data (or None) plus the log lines the caller should emit.
+    """
+    log = []
+    try:
+        if prop_type not in STAT_FIELD_MAP:
+            return None, log
+
+        stat_field = STAT_FIELD_MAP[prop_type]
+
+        if len(df) < 2:
+            log.append(f"Not enough data for {prop_type}: {len(df)} samples")
+            return None, log
+
+        grouped = df.groupby('player__player_name')[stat_field]
+        agg = grouped.agg(['mean', 'count', 'first', 'last'])
+        # Population std to match np.std, with the 10%-of-value fallback
+        # for players with a single game
+        agg['std'] = grouped.std(ddof=0)
+        single = agg['count'] == 1
+        agg.loc[single, 'std'] = agg.loc[single, 'mean'] * 0.1
+        # Simple linear trend: (last - first) / (games - 1)
+        agg['trend'] = (agg['last'] - agg['first']) / (agg['count'] - 1).clip(lower=1)
+        recent_lists = grouped.agg(lambda s: s.iloc[-2:].tolist())
+
+        # Structure-of-arrays layout: parallel arrays indexed through
+        # name_to_idx instead of a nested dict per player, with the last
+        # two games as a NaN-padded matrix
+        recent = np.full((len(agg), 2), np.nan, dtype=np.float32)
+        for i, values in enumerate(recent_lists):
+            recent[i, -len(values):] = values
+        recent_flat = recent[~np.isnan(recent)]
+
+        log.append(f"Simple model for {prop_type}:")
+        log.append(f"  Players with data: {len(agg)}")
+        log.append(f"  Total data points: {len(df)}")
+
+        return {
+            'model_type': 'simple_statistical',
+            'name_to_idx': {name: i for i, name in enumerate(agg.index)},
+            'stds': agg['std'].to_numpy(np.float32),
+            'trends': agg['trend'].to_numpy(np.float32),
+            'n_games': agg['count'].to_numpy(np.int32),
+            'recent_mean': np.nanmean(recent, axis=1).astype(np.float32),
+            'recent_count': (~np.isnan(recent)).sum(axis=1).astype(np.int32),
+            # League context the per-player blending used to rebuild from
+            # every player's recent games on every call
+            'league_avg': float(recent_flat.mean()),
+            'league_std': float(recent_flat.std()) if recent_flat.size > 1 else float(recent_flat.mean()) * 0.2,
+            'stat_field': stat_field,
+            'prop_type': prop_type
+        }, log
+
+    except Exception as e:
+        log.append(f"Error training simple model for {prop_type}: {e}")
+        return None, log
+
+
 class Command(BaseCommand):
     help = 'Generates ML predictions for existing prop lines'
 
@@ -23,10 +170,16 @@ class Command(BaseCommand):
             action='store_true',
             help='Do not save predictions to the database.',
         )
+        parser.add_argument(
+            '--monte-carlo',
+            action='store_true',
+            help='Use the sampling-based simulation instead of the closed-form probabilities (validation only).',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write("Training XGBoost models with Monte Carlo simulation...")
         dry_run = options['dry_run']
+        use_monte_carlo = options['monte_carlo']
 
         # Check if we have 2025 data to train on (current season only)
         historical_stats = PlayerStats.objects.filter(season=2025)
@@ -35,15 +188,32 @@ class Command(BaseCommand):
             self.stdout.write("Please run: python manage.py repopulate_player_stats --seasons 2025")
             return
 
-        self.stdout.write(f"Found {historical_stats.count()} 2025 player stats records for training")
+        # One scan fetches every stat column the six models need; each
+        # model then filters its own column in memory
+        all_stats = pd.DataFrame.from_records(
+            historical_stats.order_by('season', 'week').values(
+                'player__player_name', *STAT_FIELD_MAP.values()
+            )
+        )
+        self.stdout.write(f"Found {len(all_stats)} 2025 player stats records for training")
 
-        # Train XGBoost models for each prop type
-        prop_types = ['player_pass_yds', 'player_rush_yds', 'player_reception_yds', 'player_pass_attempts', 'player_rush_attempts', 'player_receptions']
+        # The six markets train independently: fan them out across cores.
+        # Threads rather than processes — the pandas groupby work releases
+        # the GIL, and loky workers would re-import this module without
+        # django.setup() and die on the model imports. joblib is imported
+        # here so plain manage.py invocations don't pay its startup cost
+        from joblib import Parallel, delayed
         trained_models = {}
-
-        for prop_type in prop_types:
-            self.stdout.write(f"Training simple model for {prop_type}...")
-            model_data = self.train_simple_model(prop_type, historical_stats)
+        results = Parallel(n_jobs=-1, prefer='threads')(
+            delayed(train_simple_model)(
+                prop_type,
+                all_stats[all_stats[stat_field].notna() & (all_stats[stat_field] != 0)],
+            )
+            for prop_type, stat_field in STAT_FIELD_MAP.items()
+        )
+        for prop_type, (model_data, log) in zip(STAT_FIELD_MAP, results):
+            for line in log:
+                self.stdout.write(line)
             if model_data:
                 trained_models[prop_type] = model_data
                 self.stdout.write(f"Successfully trained model for {prop_type}")
@@ -52,288 +222,236 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR("No models could be trained. Exiting."))
             return
 
-        # Generate predictions for current prop lines
-        prop_lines = PlayerProp.objects.filter(is_active=True).values('player_name', 'market_display', 'event', 'over_point', 'under_point')
+        # Generate predictions for current prop lines; over_point is nullable
+        # and a None line would flow through the arrays as NaN, so those rows
+        # are excluded up front
+        prop_lines = PlayerProp.objects.filter(is_active=True, over_point__isnull=False).values('player_name', 'market_display', 'event', 'over_point', 'under_point')
         self.stdout.write(f"Generating predictions for {len(prop_lines)} current prop lines")
 
         predictions_created = 0
 
+        # The simplified flow predicts every prop against one game: resolve
+        # it once, then precompute the player→team and team→latest-defense
+        # maps so the per-prop opponent adjustment is pure dict lookups
+        from core.models import TeamDefense
+        game = Game.objects.filter(season=2025, week=3).first()
+        if not game:
+            # If no 2025 week 3 game exists, use any existing game
+            game = Game.objects.first()
+        if not game:
+            self.stdout.write("No games found in database")
+            return
+        players_team_map = dict(Player.objects.values_list('player_name', 'team_id'))
+        # Each player appears once per market: memoize get_or_create_player
+        # so the mapping-aware resolution runs once per name, not per prop
+        player_cache = {}
+        latest_defense = {}
+        for defense in TeamDefense.objects.filter(
+            season=game.season, week__lte=game.week
+        ).order_by('team_id', '-week'):
+            latest_defense.setdefault(defense.team_id, defense)
+
+        # Phase 1: resolve players and model outputs row by row, collecting
+        # everything the math needs into parallel lists
+        # Resolve each distinct display label once instead of re-scanning
+        # the same handful of strings on every prop
+        market_map = {
+            display: _resolve_market_key(display)
+            for display in {prop['market_display'] for prop in prop_lines}
+        }
+
+        rows = []
         for prop in prop_lines:
             player_name = prop['player_name']
-            market_display = prop['market_display']
-            event = prop['event']
             over_line = prop['over_point']
-            under_line = prop['under_point']
-            
-            # Convert market_display to market_key format
-            market_key = market_display.lower().replace(' ', '_').replace('yards', 'yds').replace('attempts', 'attempts')
-            if 'pass' in market_display.lower():
-                market_key = 'player_pass_yds' if 'yards' in market_display.lower() else 'player_pass_attempts'
-            elif 'rush' in market_display.lower():
-                market_key = 'player_rush_yds' if 'yards' in market_display.lower() else 'player_rush_attempts'
-            elif 'reception' in market_display.lower():
-                market_key = 'player_reception_yds' if 'yards' in market_display.lower() else 'player_receptions'
+            market_key = market_map[prop['market_display']]
 
             # Skip if we don't have a trained model for this prop type
             if market_key not in trained_models:
                 continue
 
             # Get or create player
-            try:
-                player = self.get_or_create_player(player_name)
-                # Use an existing game for predictions (simplified approach)
-                from core.models import Game
-                game = Game.objects.filter(season=2025, week=3).first()
-                if not game:
-                    # If no 2025 week 3 game exists, use any existing game
-                    game = Game.objects.first()
-                if not game:
-                    self.stdout.write(f"No games found in database")
+            player = player_cache.get(player_name)
+            if player is None:
+                try:
+                    player = self.get_or_create_player(player_name)
+                    player_cache[player_name] = player
+                except Exception as e:
+                    self.stdout.write(f"Could not get player for {player_name}: {e}")
                     continue
-            except Exception as e:
-                self.stdout.write(f"Could not get player/game for {player_name}: {e}")
-                continue
 
-            # Generate prediction using simple model
-            try:
-                model_data = trained_models[market_key]
-                
-                # Use simple prediction method
-                mean_pred, sigma = self.predict_simple(player_name, game, market_key, model_data)
-                
-                if mean_pred is None or sigma is None:
-                    self.stdout.write(f"Could not generate prediction for {player_name} {market_key}")
-                    continue
-                
-                # Use over_line as the line value for prediction
-                line_value = over_line
-                
-                # Monte Carlo simulation
-                over_prob, under_prob, confidence_interval = self.monte_carlo_simulation(
-                    mean_pred, sigma, line_value, n_simulations=10000
-                )
-                
-                # Calculate edge and EV
-                edge = mean_pred - line_value
-                ev_over = (over_prob * 0.5) - ((1 - over_prob) * 0.5)  # Assuming -110 odds
-                ev_under = (under_prob * 0.5) - ((1 - under_prob) * 0.5)
-                
-                if not dry_run:
-                    # Create prediction
-                    prediction, created = Prediction.objects.update_or_create(
-                        player=player,
-                        game=game,
-                        prop_type=market_key,
-                        defaults={
-                            'predicted_value': mean_pred,
-                            'confidence_band_lower': confidence_interval[0],
-                            'confidence_band_upper': confidence_interval[1],
-                            'over_probability': over_prob,
-                            'under_probability': under_prob,
-                            'model_line': mean_pred,
-                            'user_line': line_value,
-                            'edge': edge,
-                            'rationale': f"Simple Statistical + Monte Carlo: μ={mean_pred:.1f}, σ={sigma:.1f}, P(Over)={over_prob:.1%}",
-                            'model_version': '4.0_simple',
-                        }
-                    )
-                    if created:
-                        predictions_created += 1
-                        self.stdout.write(f"Created prediction for {player_name} {market_key}: μ={mean_pred:.1f}, σ={sigma:.1f}, P(Over)={over_prob:.1%}, Edge={edge:.1f}")
-                else:
-                    self.stdout.write(f"Would create prediction for {player_name} {market_key}: μ={mean_pred:.1f}, σ={sigma:.1f}, P(Over)={over_prob:.1%}")
+            # Use over_line as the line value for prediction
+            rows.append((player_name, market_key, player, over_line))
 
-            except Exception as e:
-                self.stdout.write(f"Error generating prediction for {player_name} {market_key}: {e}")
+        # Phase 2: one batch kernel call per market computes every mean and
+        # sigma, then one vectorized pass turns them into probabilities,
+        # bands and edges
+        if rows:
+            mus = np.empty(len(rows), dtype=np.float32)
+            sigmas = np.empty(len(rows), dtype=np.float32)
+            lines = np.array([r[3] for r in rows], dtype=np.float32)
+            by_market = {}
+            for i, row in enumerate(rows):
+                by_market.setdefault(row[1], []).append(i)
+            for market_key, idxs in by_market.items():
+                names = [rows[i][0] for i in idxs]
+                adjustments = np.array([
+                    self._opponent_factor(game, market_key, name, players_team_map, latest_defense)
+                    for name in names
+                ], dtype=np.float32)
+                mu, sigma = self._predict_batch(trained_models[market_key], names, adjustments, market_key)
+                mus[idxs] = mu
+                sigmas[idxs] = sigma
+            if use_monte_carlo:
+                over_probs, _, (ci_los, ci_his) = self.monte_carlo_batch(mus, sigmas, lines)
+            else:
+                over_probs, _, (ci_los, ci_his) = self.analytic_probabilities(mus, sigmas, lines)
+            under_probs = 1.0 - over_probs
+            edges = mus - lines
+
+        # Phase 3: route every row into one bulk_create / bulk_update pair
+        # instead of an update_or_create (SELECT + write) per prop. There is
+        # no unique constraint on (player, game, prop_type), so the existing
+        # rows are resolved with one SELECT rather than ON CONFLICT.
+        prediction_fields = [
+            'predicted_value', 'confidence_band_lower', 'confidence_band_upper',
+            'over_probability', 'under_probability', 'model_line', 'user_line',
+            'edge', 'rationale', 'model_version',
+        ]
+        existing = {
+            (pr.player_id, pr.prop_type): pr
+            for pr in Prediction.objects.filter(game=game)
+        }
+        to_create = []
+        to_update = []
+
+        for i, (player_name, market_key, player, line_value) in enumerate(rows):
+            mean_pred = float(mus[i])
+            sigma = float(sigmas[i])
+            over_prob = float(over_probs[i])
+            under_prob = float(under_probs[i])
+            edge = float(edges[i])
+
+            if dry_run:
+                self.stdout.write(f"Would create prediction for {player_name} {market_key}: μ={mean_pred:.1f}, σ={sigma:.1f}, P(Over)={over_prob:.1%}")
                 continue
 
+            values = {
+                'predicted_value': mean_pred,
+                'confidence_band_lower': float(ci_los[i]),
+                'confidence_band_upper': float(ci_his[i]),
+                'over_probability': over_prob,
+                'under_probability': under_prob,
+                'model_line': mean_pred,
+                'user_line': line_value,
+                'edge': edge,
+                'rationale': f"Simple Statistical + Monte Carlo: μ={mean_pred:.1f}, σ={sigma:.1f}, P(Over)={over_prob:.1%}",
+                'model_version': '4.0_simple',
+            }
+            prediction = existing.get((player.id, market_key))
+            if prediction is not None:
+                for field, value in values.items():
+                    setattr(prediction, field, value)
+                if prediction.pk:
+                    to_update.append(prediction)
+            else:
+                prediction = Prediction(player=player, game=game, prop_type=market_key, **values)
+                existing[(player.id, market_key)] = prediction
+                to_create.append(prediction)
+                predictions_created += 1
+                self.stdout.write(f"Created prediction for {player_name} {market_key}: μ={mean_pred:.1f}, σ={sigma:.1f}, P(Over)={over_prob:.1%}, Edge={edge:.1f}")
+
+        if to_update:
+            Prediction.objects.bulk_update(to_update, prediction_fields, batch_size=1000)
+        if to_create:
+            Prediction.objects.bulk_create(to_create, batch_size=1000)
+
         if dry_run:
             self.stdout.write(f"DRY RUN - Would create {predictions_created} predictions")
         else:
             self.stdout.write(self.style.SUCCESS(f"Successfully created {predictions_created} simple statistical predictions"))
 
-    def train_simple_model(self, prop_type, historical_stats):
-        """Train simple statistical model that works with limited data"""
-        try:
-            # Map prop type to stat field
-            stat_field_map = {
-                'player_pass_yds': 'passing_yards',
-                'player_rush_yds': 'rushing_yards', 
-                'player_reception_yds': 'receiving_yards',
-                'player_pass_attempts': 'passing_attempts',
-                'player_rush_attempts': 'rushing_attempts',
-                'player_receptions': 'receiving_receptions'
-            }
-            
-            if prop_type not in stat_field_map:
-                return None
-                
-            stat_field = stat_field_map[prop_type]
-            
-            # Get all stats for this prop type
-            stats_query = historical_stats.filter(
-                **{f"{stat_field}__isnull": False}
-            ).exclude(**{stat_field: 0}).order_by('season', 'week')
-            
-            if stats_query.count() < 2:
-                self.stdout.write(f"Not enough data for {prop_type}: {stats_query.count()} samples")
-                return None
-            
-            # Collect player data for simple statistical analysis
-            player_data = {}
-            for stat in stats_query:
-                player_name = stat.player.player_name
-                if player_name not in player_data:
-                    player_data[player_name] = []
-                player_data[player_name].append({
-                    'value': getattr(stat, stat_field),
-                    'week': stat.week,
-                    'game': stat.game
-                })
-            
-            # Calculate simple statistics for each player
-            player_stats = {}
-            for player_name, games in player_data.items():
-                if len(games) < 1:
-                    continue
-                    
-                values = [g['value'] for g in games]
-                player_stats[player_name] = {
-                    'mean': np.mean(values),
-                    'std': np.std(values) if len(values) > 1 else values[0] * 0.1,  # 10% of value if only 1 game
-                    'trend': self.calculate_trend(values),
-                    'recent_games': games[-2:],  # Last 2 games
-                    'total_games': len(games)
-                }
-            
-            self.stdout.write(f"Simple model for {prop_type}:")
-            self.stdout.write(f"  Players with data: {len(player_stats)}")
-            self.stdout.write(f"  Total data points: {stats_query.count()}")
-            
-            return {
-                'model_type': 'simple_statistical',
-                'player_stats': player_stats,
-                'stat_field': stat_field,
-                'prop_type': prop_type
-            }
-            
-        except Exception as e:
-            self.stdout.write(f"Error training simple model for {prop_type}: {e}")
-            return None
+    def _predict_batch(self, model_data, player_names, adjustments, prop_type):
+        """Compute means and sigmas for one market in a single NumPy pass.
 
-    def calculate_trend(self, values):
-        """Calculate simple trend from recent values"""
-        if len(values) < 2:
-            return 0
-        # Simple linear trend: (last - first) / (len - 1)
-        return (values[-1] - values[0]) / (len(values) - 1)
+        Mirrors the old per-player predict_simple arithmetic, but over whole
+        arrays: unknown players fall back to the league stats, known players
+        get the trend, opponent and limited-data blending applied via masks.
+        """
+        name_to_idx = model_data['name_to_idx']
+        idx = np.array([name_to_idx.get(name, -1) for name in player_names])
+        known = idx >= 0
 
-    def predict_simple(self, player_name, game, prop_type, model_data):
-        """Make prediction using simple statistical model"""
-        try:
-            player_stats = model_data['player_stats']
-            
-            if player_name not in player_stats:
-                # If no data for this player, use league average
-                all_values = []
-                for stats in player_stats.values():
-                    all_values.extend([g['value'] for g in stats['recent_games']])
-                
-                if not all_values:
-                    return None, None
-                
-                mean_pred = np.mean(all_values)
-                std_pred = np.std(all_values) if len(all_values) > 1 else mean_pred * 0.2
-            else:
-                stats = player_stats[player_name]
-                
-                # Use recent average with trend adjustment
-                recent_values = [g['value'] for g in stats['recent_games']]
-                mean_pred = np.mean(recent_values)
-                
-                # Add trend if we have multiple games
-                if len(recent_values) > 1:
-                    trend_adjustment = stats['trend'] * 0.5  # Conservative trend application
-                    mean_pred += trend_adjustment
-                
-                # Use calculated std or fallback
-                std_pred = stats['std'] if stats['std'] > 0 else mean_pred * 0.15
-                
-                # Apply opponent adjustment
-                mean_pred = self.apply_opponent_adjustment(mean_pred, game, prop_type, player_name)
-                
-                # Apply conservative adjustment for limited data
-                if stats['total_games'] < 3:  # Less than 3 games of data
-                    # Blend with league average to reduce overconfidence
-                    all_values = []
-                    for other_stats in player_stats.values():
-                        all_values.extend([g['value'] for g in other_stats['recent_games']])
-                    
-                    if all_values:
-                        league_avg = np.mean(all_values)
-                        
-                        # More conservative blending for very limited data
-                        if stats['total_games'] == 1:
-                            # Only 1 game: 50% player, 50% league average
-                            mean_pred = 0.5 * mean_pred + 0.5 * league_avg
-                            std_pred = max(std_pred, mean_pred * 0.5)  # High uncertainty
-                        else:
-                            # 2 games: 70% player, 30% league average
-                            mean_pred = 0.7 * mean_pred + 0.3 * league_avg
-                            std_pred = max(std_pred, mean_pred * 0.3)
-            
-            # Ensure reasonable bounds
-            mean_pred = max(0, mean_pred)
-            std_pred = max(mean_pred * 0.05, std_pred)  # At least 5% variance
-            
-            # Prevent extreme probabilities by ensuring minimum variance
-            # This prevents 100% over/under when prediction is far from line
-            min_std = mean_pred * 0.2  # At least 20% of mean as std dev
-            std_pred = max(std_pred, min_std)
-            
-            # Additional check: if prediction is very far from typical range, increase uncertainty
-            # This handles cases where limited data might be misleading
-            if mean_pred < 5 and prop_type in ['player_pass_yds', 'player_rush_yds', 'player_reception_yds']:
-                # Very low predictions for major stats - increase uncertainty
-                std_pred = max(std_pred, mean_pred * 0.8)
-            elif mean_pred > 500 and prop_type == 'player_pass_yds':
-                # Very high passing predictions - increase uncertainty
-                std_pred = max(std_pred, mean_pred * 0.3)
-            
-            return mean_pred, std_pred
-            
-        except Exception as e:
-            self.stdout.write(f"Error in simple prediction for {player_name}: {e}")
-            return None, None
+        # League fallback fills every slot; known players overwrite below
+        mu = np.full(len(idx), model_data['league_avg'], dtype=np.float32)
+        sigma = np.full(len(idx), model_data['league_std'], dtype=np.float32)
+
+        if known.any():
+            ki = idx[known]
+            # Recent average with the conservative trend adjustment
+            mu_k = model_data['recent_mean'][ki]
+            mu_k = np.where(
+                model_data['recent_count'][ki] > 1,
+                mu_k + model_data['trends'][ki] * 0.5,
+                mu_k,
+            )
+            # Calculated std or 15%-of-mean fallback
+            sigma_k = model_data['stds'][ki]
+            sigma_k = np.where(sigma_k > 0, sigma_k, mu_k * 0.15)
+
+            # Opponent adjustment
+            mu_k = mu_k * adjustments[known]
+
+            # Blend limited-data players toward the league average
+            n = model_data['n_games'][ki]
+            league_avg = model_data['league_avg']
+            mu_k = np.where(
+                n == 1, 0.5 * mu_k + 0.5 * league_avg,
+                np.where(n == 2, 0.7 * mu_k + 0.3 * league_avg, mu_k),
+            )
+            sigma_k = np.where(
+                n == 1, np.maximum(sigma_k, mu_k * 0.5),
+                np.where(n == 2, np.maximum(sigma_k, mu_k * 0.3), sigma_k),
+            )
+            mu[known] = mu_k
+            sigma[known] = sigma_k
+
+        # Ensure reasonable bounds: non-negative mean, at least 20% of the
+        # mean as std dev so far-from-line props never hit 0%/100%
+        mu = np.maximum(mu, 0)
+        sigma = np.maximum(sigma, mu * 0.2)
 
-    def apply_opponent_adjustment(self, base_prediction, game, prop_type, player_name):
-        """Apply simple opponent strength adjustment"""
+        # Limited data can make major-stat predictions misleading: widen the
+        # uncertainty for implausibly low or high numbers
+        if prop_type in ('player_pass_yds', 'player_rush_yds', 'player_reception_yds'):
+            sigma = np.where(mu < 5, np.maximum(sigma, mu * 0.8), sigma)
+        if prop_type == 'player_pass_yds':
+            sigma = np.where(mu > 500, np.maximum(sigma, mu * 0.3), sigma)
+
+        return mu, sigma
+
+    def _opponent_factor(self, game, prop_type, player_name, players_team_map, latest_defense):
+        """Multiplier the opponent adjustment applies to a base prediction"""
         try:
-            from core.models import TeamDefense, Player
-            
             # Get player's team
-            player = Player.objects.get(player_name=player_name)
-            if not player.team:
-                return base_prediction
-            
+            team_id = players_team_map.get(player_name)
+            if not team_id:
+                return 1.0
+
             # Determine opponent
-            if player.team == game.home_team:
-                opponent_team = game.away_team
-            elif player.team == game.away_team:
-                opponent_team = game.home_team
+            if team_id == game.home_team_id:
+                opponent_id = game.away_team_id
+            elif team_id == game.away_team_id:
+                opponent_id = game.home_team_id
             else:
-                return base_prediction
-            
+                return 1.0
+
             # Get opponent defense stats
-            opponent_defense = TeamDefense.objects.filter(
-                team=opponent_team,
-                season=game.season,
-                week__lte=game.week
-            ).order_by('-week').first()
-            
+            opponent_defense = latest_defense.get(opponent_id)
+
             if not opponent_defense:
-                return base_prediction
-            
+                return 1.0
+
             # Simple adjustment based on defensive rank (1=best defense, 32=worst)
             if 'pass' in prop_type:
                 def_rank = opponent_defense.passing_defense_rank or 16
@@ -343,27 +461,19 @@ class Command(BaseCommand):
                 def_rank = opponent_defense.receiving_defense_rank or 16
             else:
                 def_rank = opponent_defense.overall_defense_rank or 16
-            
-            # Adjust prediction: better defense = lower prediction
-            # More aggressive adjustments for better defense impact
-            if def_rank <= 8:  # Top 8 defense
-                adjustment = 0.80 + (def_rank - 1) * 0.025  # 0.80 to 0.975 (20-2.5% reduction)
-            elif def_rank >= 25:  # Bottom 8 defense
-                adjustment = 1.05 + (32 - def_rank) * 0.03  # 1.05 to 1.26 (5-26% increase)
-            elif def_rank <= 16:  # Above average defense
-                adjustment = 0.90 + (def_rank - 9) * 0.014  # 0.90 to 0.998 (10-0.2% reduction)
-            else:  # Below average defense
-                adjustment = 1.01 + (def_rank - 17) * 0.02  # 1.01 to 1.30 (1-30% increase)
-            
-            return base_prediction * adjustment
-            
+
+            # One table lookup replaces the rank branches
+            return float(DEF_RANK_LUT[def_rank - 1])
+
         except Exception as e:
-            return base_prediction
+            return 1.0
 
-    def create_advanced_feature_vector(self, stat, recent_stats, game, prop_type):
-        """Create advanced feature vector with rolling averages, context, and opponent strength"""
-        from core.models import TeamDefense
-        
+    def create_advanced_feature_vector(self, stat, rolling_means, season_means, game, prop_type):
+        """Create advanced feature vector with rolling averages, context, and opponent strength.
+
+        The rolling and season-to-date averages arrive as precomputed pandas
+        Series so no aggregate queries run per call.
+        """
         try:
             # Current game context
             current_features = [
@@ -386,66 +496,15 @@ class Command(BaseCommand):
             ]
             
             # Rolling averages (last 5 games)
-            if recent_stats.exists():
-                recent_avg = recent_stats.aggregate(
-                    avg_passing_attempts=Avg('passing_attempts'),
-                    avg_passing_completions=Avg('passing_completions'),
-                    avg_passing_yards=Avg('passing_yards'),
-                    avg_passing_tds=Avg('passing_tds'),
-                    avg_rushing_attempts=Avg('rushing_attempts'),
-                    avg_rushing_yards=Avg('rushing_yards'),
-                    avg_rushing_tds=Avg('rushing_tds'),
-                    avg_receiving_targets=Avg('receiving_targets'),
-                    avg_receiving_receptions=Avg('receiving_receptions'),
-                    avg_receiving_yards=Avg('receiving_yards'),
-                    avg_receiving_tds=Avg('receiving_tds'),
-                    avg_air_yards=Avg('air_yards'),
-                    avg_yac=Avg('yac'),
-                    avg_adot=Avg('adot'),
-                    avg_target_share=Avg('target_share'),
-                    avg_snap_share=Avg('snap_share'),
-                )
-                
-                rolling_features = [
-                    recent_avg['avg_passing_attempts'] or 0,
-                    recent_avg['avg_passing_completions'] or 0,
-                    recent_avg['avg_passing_yards'] or 0,
-                    recent_avg['avg_passing_tds'] or 0,
-                    recent_avg['avg_rushing_attempts'] or 0,
-                    recent_avg['avg_rushing_yards'] or 0,
-                    recent_avg['avg_rushing_tds'] or 0,
-                    recent_avg['avg_receiving_targets'] or 0,
-                    recent_avg['avg_receiving_receptions'] or 0,
-                    recent_avg['avg_receiving_yards'] or 0,
-                    recent_avg['avg_receiving_tds'] or 0,
-                    recent_avg['avg_air_yards'] or 0,
-                    recent_avg['avg_yac'] or 0,
-                    recent_avg['avg_adot'] or 0,
-                    recent_avg['avg_target_share'] or 0,
-                    recent_avg['avg_snap_share'] or 0,
-                ]
-            else:
-                rolling_features = [0] * 16
-            
+            rolling_features = [
+                0 if pd.isna(v) else v for v in rolling_means[ROLLING_FEATURE_COLS]
+            ]
+
             # Season-to-date stats
-            season_stats = PlayerStats.objects.filter(
-                player=stat.player,
-                season=stat.season,
-                week__lt=stat.week
-            ).aggregate(
-                season_passing_attempts=Avg('passing_attempts'),
-                season_passing_yards=Avg('passing_yards'),
-                season_rushing_yards=Avg('rushing_yards'),
-                season_receiving_yards=Avg('receiving_yards'),
-            )
-            
             season_features = [
-                season_stats['season_passing_attempts'] or 0,
-                season_stats['season_passing_yards'] or 0,
-                season_stats['season_rushing_yards'] or 0,
-                season_stats['season_receiving_yards'] or 0,
+                0 if pd.isna(v) else v for v in season_means[SEASON_FEATURE_COLS]
             ]
-            
+
             # Game context
             context_features = [
                 stat.week,  # Week of season
@@ -463,8 +522,16 @@ class Command(BaseCommand):
             # Next Gen Stats features
             nextgen_features = self.get_nextgen_features(stat, prop_type)
             
-            # Combine all features
-            all_features = current_features + rolling_features + season_features + context_features + opponent_features + team_offense_features + nextgen_features
+            # Combine all features into one contiguous float32 buffer so
+            # downstream inference never reboxes a list of Python floats
+            all_features = np.concatenate((
+                np.array(
+                    current_features + rolling_features + season_features
+                    + context_features + opponent_features + team_offense_features,
+                    dtype=np.float32,
+                ),
+                nextgen_features,
+            ))
             return all_features
             
         except Exception as e:
@@ -618,7 +685,7 @@ class Command(BaseCommand):
         """Get Next Gen Stats features based on prop type"""
         try:
             # Initialize features with zeros
-            features = [0] * 15  # 15 Next Gen Stats features
+            features = np.zeros(15, dtype=np.float32)  # 15 Next Gen Stats features
             
             # Passing Next Gen Stats
             if 'pass' in prop_type:
@@ -647,96 +714,162 @@ class Command(BaseCommand):
             return features
             
         except Exception as e:
-            return [0] * 15
+            return np.zeros(15, dtype=np.float32)
 
     def get_feature_names(self):
         """Get feature names for model interpretation"""
-        current_features = [
-            'passing_attempts', 'passing_completions', 'passing_yards', 'passing_tds',
-            'rushing_attempts', 'rushing_yards', 'rushing_tds',
-            'receiving_targets', 'receiving_receptions', 'receiving_yards', 'receiving_tds',
-            'air_yards', 'yac', 'adot', 'target_share', 'snap_share'
-        ]
-        
-        rolling_features = [f'recent_avg_{f}' for f in current_features]
-        season_features = ['season_passing_attempts', 'season_passing_yards', 'season_rushing_yards', 'season_receiving_yards']
-        context_features = ['week', 'season', 'early_season', 'late_season']
-        opponent_features = [
-            'opp_passing_def_rank', 'opp_rushing_def_rank', 'opp_receiving_def_rank', 'opp_overall_def_rank',
-            'opp_avg_passing_yards_allowed', 'opp_avg_rushing_yards_allowed', 'opp_avg_receiving_yards_allowed',
-            'opp_prop_specific_1', 'opp_prop_specific_2', 'opp_prop_specific_3'
-        ]
-        
-        team_offense_features = [
-            'team_passing_yards', 'team_passing_attempts', 'team_passing_tds', 'team_passing_epa',
-            'team_passing_offense_rank', 'team_avg_passing_yards', 'team_rushing_yards', 'team_rushing_tds',
-            'team_rushing_epa', 'team_rushing_offense_rank'
-        ]
-        
-        nextgen_features = [
-            'ngs_avg_time_to_throw', 'ngs_avg_completed_air_yards', 'ngs_avg_intended_air_yards', 
-            'ngs_avg_air_yards_differential', 'ngs_aggressiveness', 'ngs_completion_pct_above_exp',
-            'ngs_avg_cushion', 'ngs_avg_separation', 'ngs_avg_expected_yac', 'ngs_avg_yac_above_expectation',
-            'ngs_efficiency', 'ngs_avg_time_to_los', 'ngs_expected_rush_yards', 'ngs_rush_yards_over_expected',
-            'ngs_rush_yards_over_expected_per_att'
-        ]
-        
-        return current_features + rolling_features + season_features + context_features + opponent_features + team_offense_features + nextgen_features
+        return list(_FEATURE_NAMES)
 
-    def monte_carlo_simulation(self, mean, sigma, line_value, n_simulations=10000):
-        """Run Monte Carlo simulation to calculate probabilities"""
-        # Generate samples from normal distribution
-        samples = np.random.normal(mean, sigma, n_simulations)
-        
-        # Calculate probabilities
-        over_count = np.sum(samples > line_value)
-        under_count = np.sum(samples < line_value)
-        
-        over_prob = over_count / n_simulations
-        under_prob = under_count / n_simulations
+    def analytic_probabilities(self, mean, sigma, line_value):
+        """Closed-form equivalent of the Monte Carlo simulation.
+
+        Accepts scalars or equal-length arrays; the math broadcasts either way.
+        """
+        # ufuncs straight from scipy.special skip the argument validation and
+        # frozen-distribution plumbing of the scipy.stats wrappers
+        from scipy.special import ndtr, ndtri
+
+        # P(X > line) for X ~ N(mean, sigma), deterministic and allocation-free
+        over_prob = 1.0 - ndtr((line_value - mean) / sigma)
+        under_prob = 1.0 - over_prob
+
+        # Same 5th-95th percentile band the sampling version estimated
+        confidence_interval = (
+            mean + sigma * ndtri(0.05),
+            mean + sigma * ndtri(0.95),
+        )
+
+        return over_prob, under_prob, confidence_interval
+
+    def monte_carlo_simulation(self, mean, sigma, line_value, n_simulations=10000, prob_only=False):
+        """Run Monte Carlo simulation to calculate probabilities.
+
+        Kept as a sampling-based cross-check of analytic_probabilities for
+        --monte-carlo runs; standard normals are drawn in float32 and scaled
+        in place, which halves the bandwidth of the old np.random.normal call.
+        With prob_only=True the sample buffer is skipped entirely and the
+        exact probabilities come straight from the normal CDF.
+        """
+        if prob_only:
+            # Callers that ignore the confidence band don't need samples at
+            # all: two erfc evaluations replace the draw, sort and reductions
+            from math import erfc, sqrt
+
+            over_prob = 0.5 * erfc((line_value - mean) / (sigma * sqrt(2)))
+            return over_prob, 1.0 - over_prob, None
+
+        samples = _RNG.standard_normal(n_simulations, dtype=np.float32)
+        np.multiply(samples, sigma, out=samples)
+        np.add(samples, mean, out=samples)
+
+        # One in-place sort serves both probabilities and the percentile
+        # band, replacing two comparison scans plus two np.percentile calls
+        # that each partially sorted the array again
+        samples.sort()
+        under_prob = np.searchsorted(samples, line_value, side='left') / n_simulations
+        over_prob = 1.0 - np.searchsorted(samples, line_value, side='right') / n_simulations
         
         # Calculate confidence interval (5th-95th percentile)
         confidence_interval = [
-            np.percentile(samples, 5),
-            np.percentile(samples, 95)
+            samples[int(0.05 * n_simulations)],
+            samples[int(0.95 * n_simulations)],
         ]
         
         return over_prob, under_prob, confidence_interval
 
-    def prepare_prediction_features(self, player, game, prop_type):
-        """Prepare features for prediction using advanced feature engineering"""
+    def monte_carlo_batch(self, means, sigmas, lines, n_simulations=10000):
+        """Monte Carlo simulation for every prop at once.
+
+        One (P, n) float32 draw replaces P separate 1-D simulations, so the
+        RNG dispatch and percentile sort each run once. Memory is n*4 bytes
+        per prop (~40MB at P=1000), so props are processed in blocks of 256.
+        """
+        means = np.asarray(means, dtype=np.float32)
+        sigmas = np.asarray(sigmas, dtype=np.float32)
+        lines = np.asarray(lines, dtype=np.float32)
+
+        over_probs = np.empty(len(means))
+        ci_los = np.empty(len(means))
+        ci_his = np.empty(len(means))
+        for start in range(0, len(means), 256):
+            stop = start + 256
+            z = _RNG.standard_normal((len(means[start:stop]), n_simulations), dtype=np.float32)
+            np.multiply(z, sigmas[start:stop, None], out=z)
+            np.add(z, means[start:stop, None], out=z)
+            over_probs[start:stop] = (z > lines[start:stop, None]).mean(axis=1)
+            ci_los[start:stop], ci_his[start:stop] = np.percentile(z, [5, 95], axis=1)
+
+        return over_probs, 1.0 - over_probs, (ci_los, ci_his)
+
+    def prepare_prediction_features(self, player, game, prop_type, season_rows=None):
+        """Prepare features for prediction using advanced feature engineering.
+
+        Callers iterating many players can pass season_rows (the player's
+        stats for game.season, newest first) from one batched query instead
+        of letting every call fetch its own.
+        """
         from core.models import PlayerMapping, TeamDefense
-        
-        # Try to find stats using the nflreadpy name if we have a mapping
-        stats_player = player
-        try:
-            mapping = PlayerMapping.objects.get(player_id=player.player_id, is_active=True)
-            # Look for stats using the nflreadpy name
-            nflreadpy_player = Player.objects.filter(player_name=mapping.nflreadpy_name).first()
-            if nflreadpy_player:
-                stats_player = nflreadpy_player
-        except PlayerMapping.DoesNotExist:
-            pass
-        
-        # Get player's recent stats (last 5 games)
-        recent_stats = PlayerStats.objects.filter(
-            player=stats_player,
-            season=game.season
-        ).order_by('-week')[:5]
-        
-        if not recent_stats.exists():
+
+        if season_rows is None:
+            # The active mappings and their nflreadpy-named players load once
+            # per command on first use; repeat calls are pure dict reads
+            if not hasattr(self, '_mappings_by_pid'):
+                self._mappings_by_pid = {
+                    m.player_id: m.nflreadpy_name
+                    for m in PlayerMapping.objects.filter(is_active=True).only(
+                        'player_id', 'nflreadpy_name'
+                    )
+                }
+                self._players_by_name = {}
+                for p in Player.objects.filter(
+                    player_name__in=set(self._mappings_by_pid.values())
+                ):
+                    self._players_by_name.setdefault(p.player_name, p)
+
+            # Try to find stats using the nflreadpy name if we have a mapping
+            stats_player = player
+            nflreadpy_name = self._mappings_by_pid.get(player.player_id)
+            if nflreadpy_name:
+                nflreadpy_player = self._players_by_name.get(nflreadpy_name)
+                if nflreadpy_player:
+                    stats_player = nflreadpy_player
+
+            # One fetch covers the current game, the rolling window and the
+            # season-to-date averages; the per-call aggregate queries are gone.
+            # only() trims the row to the columns the feature builder reads, and
+            # select_related keeps stat.player.team from lazy-loading per call
+            season_rows = list(
+                PlayerStats.objects.filter(
+                    player=stats_player,
+                    season=game.season
+                ).select_related('player__team').only(
+                    'week', 'season', 'player__team',
+                    *ROLLING_FEATURE_COLS, *NEXTGEN_FEATURE_COLS,
+                ).order_by('-week')
+            )
+
+        if not season_rows:
             # Use default features if no recent stats
-            return [0] * 50  # 50 features total (increased from 40)
-        
+            return np.zeros(50, dtype=np.float32)  # 50 features total (increased from 40)
+
         # Create a mock current stat for feature creation
         # We'll use the most recent stat as a proxy
-        latest_stat = recent_stats.first()
-        
+        latest_stat = season_rows[0]
+
+        df = pd.DataFrame.from_records(
+            [
+                {col: getattr(row, col) for col in ROLLING_FEATURE_COLS} | {'week': row.week}
+                for row in season_rows
+            ]
+        )
+        rolling_means = df.iloc[1:5][ROLLING_FEATURE_COLS].mean()
+        season_means = df[df['week'] < latest_stat.week][SEASON_FEATURE_COLS].mean()
+
         # Create advanced feature vector
-        features = self.create_advanced_feature_vector(latest_stat, recent_stats[1:], game, prop_type)
+        features = self.create_advanced_feature_vector(latest_stat, rolling_means, season_means, game, prop_type)
         
         if features is None:
-            return [0] * 50
+            return np.zeros(50, dtype=np.float32)
         
         return features
 
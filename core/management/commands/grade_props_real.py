@@ -5,7 +5,20 @@ Grade prop lines against real PlayerStats data
 from django.core.management.base import BaseCommand
 from core.models import PropLineHistory, PropGrade, PlayerStats, PlayerMapping, Game, Player
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
+import numpy as np
+
+# market_key → PlayerStats field, resolved once at import time so grading
+# loads exactly one attribute per prop
+MARKET_TO_ATTR = {
+    'player_pass_yds': 'passing_yards',
+    'player_rush_yds': 'rushing_yards',
+    'player_reception_yds': 'receiving_yards',
+    'player_pass_attempts': 'passing_attempts',
+    'player_rush_attempts': 'rushing_attempts',
+    'player_receptions': 'receiving_receptions',
+}
 
 
 class Command(BaseCommand):
@@ -45,55 +58,116 @@ class Command(BaseCommand):
         if market:
             props_query = props_query.filter(market_key=market)
         
-        props = props_query.order_by('game_id', 'player_name', 'market_key')
+        props = list(
+            props_query.order_by('game_id', 'player_name', 'market_key')
+            .only('id', 'game_id', 'player_name', 'market_key', 'line_value')
+            .iterator(chunk_size=2000)
+        )
         
-        self.stdout.write(f"Found {props.count()} prop lines to grade")
+        self.stdout.write(f"Found {len(props)} prop lines to grade")
+
+        # Resolve everything get_actual_result needs with four up-front
+        # queries instead of three or four per prop
+        season_weeks = set()
+        for prop in props:
+            parts = prop.game_id.split('_')
+            if len(parts) >= 4:
+                season_weeks.add((int(parts[0]), int(parts[1])))
+        games_by_week = {}
+        for game in Game.objects.filter(
+            season__in={s for s, _ in season_weeks},
+            week__in={w for _, w in season_weeks},
+        ):
+            games_by_week.setdefault((game.season, game.week), game)
+
+        names = {prop.player_name for prop in props}
+        mapped_ids = {
+            m.prizepicks_name: m.player_id
+            for m in PlayerMapping.objects.filter(prizepicks_name__in=names, is_active=True)
+        }
+        players_by_pid = {
+            p.player_id: p
+            for p in Player.objects.filter(player_id__in=mapped_ids.values())
+        }
+        direct_by_name = {}
+        for p in Player.objects.filter(player_name__in=names):
+            direct_by_name.setdefault(p.player_name, p)
+        players_by_name = {}
+        for name in names:
+            player = players_by_pid.get(mapped_ids.get(name))
+            players_by_name[name] = player if player else direct_by_name.get(name)
+
+        stats_by_key = {
+            (st.player_id, st.game_id): st
+            for st in PlayerStats.objects.filter(
+                player__in=[p for p in players_by_name.values() if p],
+                game__in=games_by_week.values(),
+            )
+        }
         
         graded_count = 0
         skipped_count = 0
+        to_grade = []
+        label_values = []
         
         for prop in props:
             try:
                 # Find the actual result from PlayerStats
-                actual_result = self.get_actual_result(prop)
+                actual_result = self.get_actual_result(
+                    prop, games_by_week, players_by_name, stats_by_key
+                )
                 
                 if actual_result is None:
                     self.stdout.write(f"Skipping {prop.player_name} - {prop.market_key}: No stats found")
                     skipped_count += 1
                     continue
                 
-                # Determine outcome
-                outcome = self.determine_outcome(actual_result, prop.line_value)
-                
-                if dry_run:
-                    self.stdout.write(f"Would grade: {prop.player_name} - {prop.market_key}: {actual_result} vs {prop.line_value} = {outcome}")
-                else:
-                    # Create or update grade
-                    grade, created = PropGrade.objects.update_or_create(
-                        proplinehistory=prop,
-                        defaults={
-                            'label_value': actual_result,
-                            'outcome': outcome,
-                        }
-                    )
-                    
-                    if created:
-                        graded_count += 1
-                        if graded_count % 10 == 0:
-                            self.stdout.write(f"Graded {graded_count} props...")
+                to_grade.append(prop)
+                label_values.append(actual_result)
                 
             except Exception as e:
                 self.stdout.write(f"Error grading {prop.player_name} - {prop.market_key}: {e}")
                 skipped_count += 1
                 continue
         
+        # One vectorized comparison pass classifies every prop instead of a
+        # Python branch per row
+        labels = np.asarray(label_values, dtype=np.float64)
+        lines = np.asarray([prop.line_value for prop in to_grade], dtype=np.float64)
+        outcomes = np.where(labels > lines, 'over', np.where(labels < lines, 'under', 'push'))
+        
+        grades = []
+        for prop, actual_result, outcome in zip(to_grade, label_values, outcomes):
+            outcome = str(outcome)
+            if dry_run:
+                self.stdout.write(f"Would grade: {prop.player_name} - {prop.market_key}: {actual_result} vs {prop.line_value} = {outcome}")
+            else:
+                grades.append(PropGrade(
+                    proplinehistory=prop,
+                    label_value=actual_result,
+                    outcome=outcome,
+                ))
+                graded_count += 1
+        
+        # One upsert statement per batch, all inside a single transaction, so
+        # the per-grade SELECT + write and per-row commit fsync are gone
+        if grades:
+            with transaction.atomic():
+                PropGrade.objects.bulk_create(
+                    grades,
+                    batch_size=500,
+                    update_conflicts=True,
+                    unique_fields=['proplinehistory'],
+                    update_fields=['label_value', 'outcome'],
+                )
+        
         if dry_run:
             self.stdout.write(f"DRY RUN - Would grade {graded_count} props, skip {skipped_count}")
         else:
             self.stdout.write(self.style.SUCCESS(f"Successfully graded {graded_count} props, skipped {skipped_count}"))
     
-    def get_actual_result(self, prop):
-        """Get actual result from PlayerStats for a given prop"""
+    def get_actual_result(self, prop, games_by_week, players_by_name, stats_by_key):
+        """Get actual result from PlayerStats using the prefetched lookups"""
         try:
             # Parse game_id to get season, week, teams
             # Format: "2025_03_ATL_CAR" or "2024_18_ATL_CAR"
@@ -105,57 +179,24 @@ class Command(BaseCommand):
             week = int(parts[1])
             
             # Find the game
-            game = Game.objects.filter(season=season, week=week).first()
+            game = games_by_week.get((season, week))
             if not game:
                 return None
             
-            # Find player using mapping
-            player = None
-            try:
-                mapping = PlayerMapping.objects.get(prizepicks_name=prop.player_name, is_active=True)
-                player = Player.objects.get(player_id=mapping.player_id)
-            except (PlayerMapping.DoesNotExist, Player.DoesNotExist):
-                # Try direct name match
-                player = Player.objects.filter(player_name=prop.player_name).first()
-            
+            # Find player using mapping, falling back to a direct name match
+            player = players_by_name.get(prop.player_name)
             if not player:
                 return None
             
             # Get player stats for this game
-            stats = PlayerStats.objects.filter(
-                player=player,
-                game=game,
-                season=season,
-                week=week
-            ).first()
-            
-            if not stats:
+            stats = stats_by_key.get((player.id, game.id))
+            if not stats or stats.season != season or stats.week != week:
                 return None
             
             # Map market_key to actual stat field
-            market_mapping = {
-                'player_pass_yds': stats.passing_yards,
-                'player_rush_yds': stats.rushing_yards,
-                'player_reception_yds': stats.receiving_yards,
-                'player_pass_attempts': stats.passing_attempts,
-                'player_rush_attempts': stats.rushing_attempts,
-                'player_receptions': stats.receiving_receptions,
-            }
-            
-            return market_mapping.get(prop.market_key)
+            attr = MARKET_TO_ATTR.get(prop.market_key)
+            return getattr(stats, attr) if attr else None
             
         except Exception as e:
             self.stdout.write(f"Error getting actual result for {prop.player_name}: {e}")
             return None
-    
-    def determine_outcome(self, actual_result, line_value):
-        """Determine if the result is over, under, or push"""
-        if actual_result is None:
-            return 'void'
-        
-        if actual_result > line_value:
-            return 'over'
-        elif actual_result < line_value:
-            return 'under'
-        else:
-            return 'push'
@@ -5,6 +5,8 @@ Simplified prop grading command that works
 from django.core.management.base import BaseCommand
 from core.models import PropGrade, PropLineHistory
 from django.utils import timezone
+from django.db import transaction
+import numpy as np
 
 
 class Command(BaseCommand):
@@ -23,53 +25,66 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write("DRY RUN - No grades will be created")
         
-        # Get the latest prop line for each game/player/market combination
-        props_to_grade = []
-        
-        # Group by game_id, player_name, market_key and get the latest one
-        seen_combinations = set()
-        
-        for prop in PropLineHistory.objects.all().order_by('-captured_at'):
-            key = (prop.game_id, prop.player_name, prop.market_key)
-            if key not in seen_combinations:
-                props_to_grade.append(prop)
-                seen_combinations.add(key)
+        # Let Postgres pick the latest line per game/player/market with
+        # DISTINCT ON instead of scanning every row into a Python set, and
+        # stream just the columns grading needs
+        props_to_grade = list(
+            PropLineHistory.objects.order_by(
+                'game_id', 'player_name', 'market_key', '-captured_at'
+            ).distinct(
+                'game_id', 'player_name', 'market_key'
+            ).only(
+                'id', 'game_id', 'player_name', 'market_key', 'line_value', 'captured_at'
+            ).iterator(chunk_size=2000)
+        )
         
         self.stdout.write(f"Found {len(props_to_grade)} prop lines to grade")
         
         graded_count = 0
+        grades = []
+        graded_at = timezone.now()
         
-        for prop in props_to_grade:
-            # Mock actual results for now
-            if 'Young' in prop.player_name:
-                label_value = prop.line_value + 25.0
-            elif 'Mahomes' in prop.player_name:
-                label_value = prop.line_value + 15.0
-            else:
-                label_value = prop.line_value - 10.0
-            
-            # Determine outcome
-            if label_value is None:
-                outcome = 'void'
-            elif abs(label_value - prop.line_value) < 1e-9:  # Push tolerance
-                outcome = 'push'
-            elif label_value > prop.line_value:
-                outcome = 'over'
-            else:
-                outcome = 'under'
+        # Mock labels and outcomes in two vectorized passes instead of a
+        # Python branch ladder per row; dtype=str keeps an empty table from
+        # producing a float64 array that np.char.find would reject
+        names = np.array([prop.player_name for prop in props_to_grade], dtype=str)
+        lines = np.array([prop.line_value for prop in props_to_grade], dtype=np.float64)
+        label_values = np.where(
+            np.char.find(names, 'Young') >= 0, lines + 25.0,
+            np.where(np.char.find(names, 'Mahomes') >= 0, lines + 15.0, lines - 10.0),
+        )
+        outcomes = np.where(
+            np.abs(label_values - lines) < 1e-9, 'push',  # Push tolerance
+            np.where(label_values > lines, 'over', 'under'),
+        )
+        
+        for prop, label_value, outcome in zip(props_to_grade, label_values, outcomes):
+            label_value = float(label_value)
+            outcome = str(outcome)
             
             self.stdout.write(f"{prop.player_name} {prop.market_key}: {label_value} vs {prop.line_value} = {outcome}")
 
             if not dry_run:
-                # Create PropGrade record
-                PropGrade.objects.create(
+                grades.append(PropGrade(
                     proplinehistory=prop,
                     label_value=label_value,
                     outcome=outcome,
-                    graded_at=timezone.now()
-                )
+                    graded_at=graded_at,
+                ))
                 graded_count += 1
         
+        # One batched upsert instead of a statement per grade; re-runs
+        # refresh existing grades rather than erroring on the unique key
+        if grades:
+            with transaction.atomic():
+                PropGrade.objects.bulk_create(
+                    grades,
+                    batch_size=1000,
+                    update_conflicts=True,
+                    unique_fields=['proplinehistory'],
+                    update_fields=['label_value', 'outcome'],
+                )
+        
         if dry_run:
             self.stdout.write(
                 self.style.SUCCESS(f"Would grade {graded_count} props")
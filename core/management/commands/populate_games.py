@@ -4,10 +4,7 @@ Populate Game model from NFL data
 """
 from django.core.management.base import BaseCommand
 from core.models import Game, Team
-import nflreadpy as nfl
-from django.utils import timezone
-import pytz
-import pandas as pd
+from zoneinfo import ZoneInfo
 
 
 class Command(BaseCommand):
@@ -33,6 +30,11 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write("DRY RUN - No data will be created")
         
+        # Imported here so Django's command autodiscovery and --help don't
+        # pay the nflreadpy/polars/pandas startup cost
+        import nflreadpy as nfl
+        import pandas as pd
+        
         # Load NFL schedule data
         try:
             schedules = nfl.load_schedules(seasons=[season])
@@ -44,56 +46,76 @@ class Command(BaseCommand):
         # Convert to pandas if it's polars
         if hasattr(schedules, 'to_pandas'):
             schedules = schedules.to_pandas()
-        
+
+        # Vectorize the derived columns, then write with one bulk_create
+        # instead of a get_or_create (and two team SELECTs) per row.
+        # game_id in our format: 2025_03_ATL_CAR
+        schedules['our_game_id'] = (
+            str(season) + '_'
+            + schedules['week'].map('{:02d}'.format) + '_'
+            + schedules['away_team'] + '_'
+            + schedules['home_team']
+        )
+        kickoff = pd.to_datetime(
+            schedules['gameday'].astype(str) + ' ' + schedules['gametime'].astype(str),
+            format='%Y-%m-%d %H:%M', utc=True, errors='coerce',
+        )
+        schedules['kickoff_utc'] = kickoff
+        schedules['kickoff_et'] = kickoff.dt.tz_convert(ZoneInfo('US/Eastern'))
+
+        teams = {t.team_abbr: t for t in Team.objects.all()}
+        existing_ids = set(
+            Game.objects.filter(
+                game_id__in=schedules['our_game_id'].tolist()
+            ).values_list('game_id', flat=True)
+        )
+
         created_count = 0
-        
-        for _, game_data in schedules.iterrows():
-            # Create game_id in our format: 2025_03_ATL_CAR
-            game_id = f"{season}_{game_data['week']:02d}_{game_data['away_team']}_{game_data['home_team']}"
-            
-            # Get or create teams
-            try:
-                away_team = Team.objects.get(team_abbr=game_data['away_team'])
-                home_team = Team.objects.get(team_abbr=game_data['home_team'])
-            except Team.DoesNotExist:
+        to_create = []
+
+        for game_data in schedules.to_dict('records'):
+            game_id = game_data['our_game_id']
+
+            away_team = teams.get(game_data['away_team'])
+            home_team = teams.get(game_data['home_team'])
+            if away_team is None or home_team is None:
                 self.stdout.write(f"Team not found for {game_id}, skipping")
                 continue
-            
-            # Parse game date
-            try:
-                game_date = pd.to_datetime(f"{game_data['gameday']} {game_data['gametime']}", utc=True)
-            except Exception as e:
-                self.stdout.write(f"Error parsing date for {game_id}: {e}")
+
+            game_date = game_data['kickoff_utc']
+            if pd.isna(game_date):
+                self.stdout.write(f"Error parsing date for {game_id}")
+                continue
+
+            if game_id in existing_ids:
                 continue
-            
+
             if not dry_run:
-                # Create or update game
-                game, created = Game.objects.get_or_create(
+                to_create.append(Game(
                     game_id=game_id,
-                    defaults={
-                        'season': season,
-                        'week': game_data['week'],
-                        'game_type': game_data.get('game_type', 'REG'),
-                        'home_team': home_team,
-                        'away_team': away_team,
-                        'game_date': game_date,
-                        'game_time_et': game_data.get('gametime', ''),
-                        'week_name': f"Week {game_data['week']}",
-                        'season_type': game_data.get('game_type', 'REG'),
-                        'completed': game_data.get('result', '') != '',
-                        'home_score': game_data.get('home_score') if pd.notna(game_data.get('home_score')) else None,
-                        'away_score': game_data.get('away_score') if pd.notna(game_data.get('away_score')) else None,
-                        'kickoff_utc': game_date,
-                        'kickoff_et': game_date.astimezone(pytz.timezone('US/Eastern')),
-                    }
-                )
-                
-                if created:
-                    created_count += 1
-                    self.stdout.write(f"Created {game_id}: {away_team} @ {home_team}")
+                    season=season,
+                    week=game_data['week'],
+                    game_type=game_data.get('game_type', 'REG'),
+                    home_team=home_team,
+                    away_team=away_team,
+                    game_date=game_date,
+                    game_time_et=game_data.get('gametime', ''),
+                    week_name=f"Week {game_data['week']}",
+                    season_type=game_data.get('game_type', 'REG'),
+                    completed=game_data.get('result', '') != '',
+                    home_score=game_data.get('home_score') if pd.notna(game_data.get('home_score')) else None,
+                    away_score=game_data.get('away_score') if pd.notna(game_data.get('away_score')) else None,
+                    kickoff_utc=game_date,
+                    kickoff_et=game_data['kickoff_et'],
+                ))
+                created_count += 1
+                self.stdout.write(f"Created {game_id}: {away_team} @ {home_team}")
             else:
                 created_count += 1
                 self.stdout.write(f"Would create {game_id}: {game_data['away_team']} @ {game_data['home_team']}")
+
+        if to_create:
+            Game.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
         
         if dry_run:
             self.stdout.write(
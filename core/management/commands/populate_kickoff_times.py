@@ -4,10 +4,7 @@ Populate kickoff times for games using NFL data
 """
 from django.core.management.base import BaseCommand
 from core.models import Game
-import nflreadpy as nfl
-from django.utils import timezone
-import pytz
-import pandas as pd
+from zoneinfo import ZoneInfo
 
 
 class Command(BaseCommand):
@@ -33,6 +30,11 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write("DRY RUN - No data will be updated")
         
+        # Imported here so Django's command autodiscovery and --help don't
+        # pay the nflreadpy/polars/pandas startup cost
+        import nflreadpy as nfl
+        import pandas as pd
+        
         # Load NFL schedule data
         try:
             schedules = nfl.load_schedules(seasons=[season])
@@ -46,38 +48,44 @@ class Command(BaseCommand):
         # Convert to pandas if it's polars
         if hasattr(schedules, 'to_pandas'):
             schedules = schedules.to_pandas()
-        
-        for _, game_data in schedules.iterrows():
+
+        # Parse every kickoff in one vectorized pass, resolve the games with
+        # one IN-query and flush the changes with one bulk_update
+        kickoff = pd.to_datetime(
+            schedules['gameday'].astype(str) + ' ' + schedules['gametime'].astype(str),
+            format='%Y-%m-%d %H:%M', utc=True, errors='coerce',
+        )
+        schedules['kickoff_utc'] = kickoff
+        schedules['kickoff_et'] = kickoff.dt.tz_convert(ZoneInfo('US/Eastern'))
+
+        games = Game.objects.in_bulk(schedules['game_id'].tolist(), field_name='game_id')
+        to_update = []
+
+        for game_data in schedules.to_dict('records'):
             game_id = game_data['game_id']
-            
+
             # Try to find our Game model
-            try:
-                game = Game.objects.get(game_id=game_id)
-            except Game.DoesNotExist:
+            game = games.get(game_id)
+            if game is None:
                 self.stdout.write(f"Game {game_id} not found in our database, skipping")
                 continue
-            
+
             # Parse kickoff time
-            if 'gametime' in game_data and pd.notna(game_data['gametime']):
-                try:
-                    # Convert to UTC datetime
-                    kickoff_utc = pd.to_datetime(f"{game_data['gameday']} {game_data['gametime']}", utc=True)
-                    
-                    # Convert to Eastern
-                    et_tz = pytz.timezone('US/Eastern')
-                    kickoff_et = kickoff_utc.astimezone(et_tz)
-                    
-                    if not dry_run:
-                        game.kickoff_utc = kickoff_utc
-                        game.kickoff_et = kickoff_et
-                        game.save()
-                    
-                    updated_count += 1
-                    self.stdout.write(f"Updated {game_id}: {kickoff_utc} UTC")
-                    
-                except Exception as e:
-                    self.stdout.write(f"Error parsing time for {game_id}: {e}")
-                    continue
+            if pd.isna(game_data['kickoff_utc']):
+                if pd.notna(game_data.get('gametime')):
+                    self.stdout.write(f"Error parsing time for {game_id}")
+                continue
+
+            if not dry_run:
+                game.kickoff_utc = game_data['kickoff_utc']
+                game.kickoff_et = game_data['kickoff_et']
+                to_update.append(game)
+
+            updated_count += 1
+            self.stdout.write(f"Updated {game_id}: {game_data['kickoff_utc']} UTC")
+
+        if to_update:
+            Game.objects.bulk_update(to_update, ['kickoff_utc', 'kickoff_et'], batch_size=500)
         
         if dry_run:
             self.stdout.write(
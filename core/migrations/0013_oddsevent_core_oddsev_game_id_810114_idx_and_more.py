@@ -0,0 +1,21 @@
+# Generated by Django 5.0.8 on 2026-09-01 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_add_nextgen_stats_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='oddsevent',
+            index=models.Index(fields=['game_id', 'is_active'], name='core_oddsev_game_id_810114_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerprop',
+            index=models.Index(fields=['event', 'market_key', 'is_active'], name='core_player_event_i_40f54d_idx'),
+        ),
+    ]
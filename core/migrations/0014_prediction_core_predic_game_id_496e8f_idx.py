@@ -0,0 +1,17 @@
+# Generated by Django 5.0.8 on 2026-09-01 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_oddsevent_core_oddsev_game_id_810114_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(fields=['game', 'prop_type', 'player'], name='core_predic_game_id_496e8f_idx'),
+        ),
+    ]
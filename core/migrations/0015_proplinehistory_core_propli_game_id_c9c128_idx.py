@@ -0,0 +1,17 @@
+# Generated by Django 5.0.8 on 2026-09-01 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_prediction_core_predic_game_id_496e8f_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proplinehistory',
+            index=models.Index(fields=['game_id', 'player_name', 'market_key', 'captured_at'], name='core_propli_game_id_c9c128_idx'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_proplinehistory_core_propli_game_id_c9c128_idx'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='playermapping',
+            constraint=models.UniqueConstraint(fields=('prizepicks_name',), name='uniq_pp_name'),
+        ),
+    ]
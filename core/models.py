@@ -290,9 +290,12 @@ class Prediction(models.Model):
     
     def __str__(self):
         return f"{self.player} {self.prop_type} - {self.predicted_value}"
-    
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['game', 'prop_type', 'player']),
+        ]
 
 
 class GamePrediction(models.Model):
@@ -383,6 +386,9 @@ class OddsEvent(models.Model):
     
     class Meta:
         ordering = ['-commence_time']
+        indexes = [
+            models.Index(fields=['game_id', 'is_active']),
+        ]
 
 
 class PlayerProp(models.Model):
@@ -408,6 +414,9 @@ class PlayerProp(models.Model):
     class Meta:
         ordering = ['market_key', 'player_name']
         unique_together = ['event', 'player_name', 'market_key']
+        indexes = [
+            models.Index(fields=['event', 'market_key', 'is_active']),
+        ]
 
 
 class PropLineHistory(models.Model):
@@ -433,6 +442,8 @@ class PropLineHistory(models.Model):
         indexes = [
             models.Index(fields=['game_id', 'player_name', 'market_key']),
             models.Index(fields=['captured_at']),
+            # Feeds the CLV window partitioning without a full-table sort
+            models.Index(fields=['game_id', 'player_name', 'market_key', 'captured_at']),
         ]
     
     def __str__(self):
@@ -528,4 +539,9 @@ class PlayerMapping(models.Model):
             models.Index(fields=['nflreadpy_name']),
             models.Index(fields=['prizepicks_name']),
             models.Index(fields=['player_id']),
+        ]
+        constraints = [
+            # Upserts keyed on prizepicks_name need a unique index to hit the
+            # ON CONFLICT fast path
+            models.UniqueConstraint(fields=['prizepicks_name'], name='uniq_pp_name'),
         ]
\ No newline at end of file
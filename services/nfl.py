@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import json
 import os
 from dataclasses import dataclass
@@ -32,13 +33,25 @@ def _read_parquet_if_exists(path: Path) -> Optional[pd.DataFrame]:
     return None
 
 
+# In-process memoization: the schedule and its game_id index are rebuilt on
+# every request otherwise (parquet parse + dict construction per page load).
+_SCHEDULE_CACHE: Optional[pd.DataFrame] = None
+_GAME_ID_MAP_CACHE: Optional[tuple[int, Dict[str, Dict[str, Any]]]] = None
+_GAMES_BY_WEEK_CACHE: Optional[tuple[int, Dict[int, list]]] = None
+
+
 def load_schedule_2025(refresh: bool = False) -> pd.DataFrame:
     import nflreadpy
 
+    global _SCHEDULE_CACHE
+    if not refresh and _SCHEDULE_CACHE is not None:
+        return _SCHEDULE_CACHE
+
     path = _cache_path(f'schedule_{SEASON}.parquet')
     if not refresh:
         cached = _read_parquet_if_exists(path)
         if cached is not None:
+            _SCHEDULE_CACHE = cached
             return cached
 
     # nflreadpy returns Polars DataFrame, convert to pandas
@@ -46,6 +59,7 @@ def load_schedule_2025(refresh: bool = False) -> pd.DataFrame:
     df_polars = df_polars.filter(pl.col('season') == SEASON)
     df = df_polars.to_pandas()
     df.to_parquet(path, index=False)
+    _SCHEDULE_CACHE = df
     return df
 
 
@@ -95,8 +109,12 @@ def guess_current_week(schedule: Optional[pd.DataFrame] = None) -> int:
 
 
 def game_id_map(schedule: Optional[pd.DataFrame] = None) -> Dict[str, Dict[str, Any]]:
+    global _GAME_ID_MAP_CACHE
     if schedule is None:
         schedule = load_schedule_2025()
+    # Reuse the built map while the same schedule frame is cached
+    if _GAME_ID_MAP_CACHE is not None and _GAME_ID_MAP_CACHE[0] == id(schedule):
+        return _GAME_ID_MAP_CACHE[1]
     out: Dict[str, Dict[str, Any]] = {}
     # Build timezone-aware kickoff and convert to UTC ISO string
     import pandas as pd
@@ -121,9 +139,24 @@ def game_id_map(schedule: Optional[pd.DataFrame] = None) -> Dict[str, Dict[str,
             'gameday': r.get('gameday'),
             'kickoff': kickoff_iso,
         }
+    _GAME_ID_MAP_CACHE = (id(schedule), out)
     return out
 
 
+def games_by_week(schedule: Optional[pd.DataFrame] = None) -> Dict[int, list]:
+    """Secondary {week: [games...]} index over game_id_map so views avoid
+    rescanning all ~272 games per request."""
+    global _GAMES_BY_WEEK_CACHE
+    games_map = game_id_map(schedule)
+    if _GAMES_BY_WEEK_CACHE is not None and _GAMES_BY_WEEK_CACHE[0] == id(games_map):
+        return _GAMES_BY_WEEK_CACHE[1]
+    by_week: Dict[int, list] = {}
+    for g in games_map.values():
+        by_week.setdefault(g['week'], []).append(g)
+    _GAMES_BY_WEEK_CACHE = (id(games_map), by_week)
+    return by_week
+
+
 def starting_qbs_for_week(week: int, weekly_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     if weekly_df is None:
         weekly_df = load_weekly_2025(week)
@@ -161,6 +194,26 @@ def previous_week_qb_line(week: int, player_id: str) -> Optional[Dict[str, Any]]
     }
 
 
+def previous_week_qb_lines(week: int, player_ids: list[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Batched previous_week_qb_line: one prior-week frame load and a single
+    isin() filter instead of one lookup per QB."""
+    out: Dict[str, Optional[Dict[str, Any]]] = {pid: None for pid in player_ids}
+    prev_week = week - 1
+    if prev_week < 1:
+        return out
+    df_prev = load_weekly_2025(prev_week)
+    rows = df_prev[(df_prev['position'] == 'QB') & (df_prev['player_id'].isin(player_ids))]
+    for r in rows.to_dict('records'):
+        out[str(r['player_id'])] = {
+            'att': int(r.get('passing_att', r.get('attempts', 0))),
+            'cmp': int(r.get('passing_cmp', r.get('completions', 0))),
+            'yds': int(r.get('passing_yards', r.get('pass_yards', 0))),
+            'td': int(r.get('passing_tds', r.get('pass_td', 0))),
+            'int': int(r.get('passing_int', r.get('interceptions', 0))),
+        }
+    return out
+
+
 def get_current_week(season: int, now: datetime | None = None) -> int:
     """
     Determine current NFL week strictly from schedule timing/status.
@@ -198,6 +251,14 @@ def get_current_week_games(season: int, week: int) -> pd.DataFrame:
     return df[["game_id", "game_id_sb", "week", "home_team", "away_team", "game_type"]]
 
 
+@functools.lru_cache(maxsize=8)
+def current_week_game_ids(season: int, week: int) -> frozenset:
+    """Cached set of canonical game ids for a week so membership tests don't
+    rebuild a set from the pandas column on every request."""
+    games = get_current_week_games(season, week)
+    return frozenset(games["game_id_sb"].tolist())
+
+
 def refresh_week_cache(week: int) -> None:
     load_schedule_2025(refresh=True)
     load_weekly_2025(week=week, refresh=True)